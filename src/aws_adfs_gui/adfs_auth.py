@@ -2,9 +2,45 @@
 
 import asyncio
 import os
+import re
 
 from .models import ADFSCredentials, AuthenticationRequest, ConnectionSettings
 
+# Every error keyword, matched in a single pass over the output
+_ERROR_KEYWORDS = re.compile(
+    r"(?P<credentials>invalid username or password|authentication failed)"
+    r"|(?P<refused>connection refused|unable to connect)"
+    r"|(?P<ssl>ssl)"
+    r"|(?P<certificate>certificate|verify)"
+    r"|(?P<timeout>timeout)"
+    r"|(?P<not_found>command not found|aws-adfs)"
+    r"|(?P<permission>permission denied)"
+    r"|(?P<unreachable>network is unreachable)"
+    r"|(?P<resolve>name or service not known)",
+    re.IGNORECASE,
+)
+
+# User-friendly messages in priority order, each with the keywords it requires
+_ERROR_MESSAGES: tuple[tuple[frozenset[str], str], ...] = (
+    (frozenset({"credentials"}), "Invalid username or password. Please check your credentials."),
+    (
+        frozenset({"refused"}),
+        "Cannot connect to ADFS server. Please check the hostname and network connection.",
+    ),
+    (
+        frozenset({"ssl", "certificate"}),
+        "SSL certificate error. Please check your certificate file or disable SSL verification.",
+    ),
+    (
+        frozenset({"timeout"}),
+        "Connection timeout. Please check your network connection and ADFS server availability.",
+    ),
+    (frozenset({"not_found"}), "aws-adfs command not found. Please install aws-adfs: pip install aws-adfs"),
+    (frozenset({"permission"}), "Permission denied. Please check your system permissions."),
+    (frozenset({"unreachable"}), "Network is unreachable. Please check your internet connection."),
+    (frozenset({"resolve"}), "Cannot resolve ADFS server hostname. Please check the server address."),
+)
+
 
 class ADFSAuthenticator:
     """Handles ADFS authentication using aws-adfs command."""
@@ -34,6 +70,11 @@ class ADFSAuthenticator:
             # Execute the command
             success, output = await self._execute_command(cmd, env, request.settings.timeout)
 
+            # aws-adfs may have rewritten the profile's credentials; re-check them next time
+            from .aws_credentials import credentials_manager
+
+            credentials_manager.invalidate(request.profile)
+
             if success:
                 self.authenticated_profiles[request.profile] = True
                 return True, f"Successfully authenticated profile '{request.profile}'"
@@ -122,34 +163,23 @@ class ADFSAuthenticator:
         if not output:
             return "Unknown error occurred"
 
-        output_lower = output.lower()
-
-        # Common error patterns and user-friendly messages
-        if "invalid username or password" in output_lower or "authentication failed" in output_lower:
-            return "Invalid username or password. Please check your credentials."
-        elif "connection refused" in output_lower or "unable to connect" in output_lower:
-            return "Cannot connect to ADFS server. Please check the hostname and network connection."
-        elif "ssl" in output_lower and ("certificate" in output_lower or "verify" in output_lower):
-            return "SSL certificate error. Please check your certificate file or disable SSL verification."
-        elif "timeout" in output_lower:
-            return "Connection timeout. Please check your network connection and ADFS server availability."
-        elif "command not found" in output_lower or "aws-adfs" in output_lower:
-            return "aws-adfs command not found. Please install aws-adfs: pip install aws-adfs"
-        elif "permission denied" in output_lower:
-            return "Permission denied. Please check your system permissions."
-        elif "network is unreachable" in output_lower:
-            return "Network is unreachable. Please check your internet connection."
-        elif "name or service not known" in output_lower:
-            return "Cannot resolve ADFS server hostname. Please check the server address."
-        else:
-            # Return the first line of the error for debugging, but cleaned up
-            first_line = output.split("\n")[0].strip()
-            return first_line if first_line else "Unknown authentication error"
+        found = {match.lastgroup for match in _ERROR_KEYWORDS.finditer(output)}
+        for required, message in _ERROR_MESSAGES:
+            if required <= found:
+                return message
+
+        # Return the first line of the error for debugging, but cleaned up
+        first_line = output.split("\n")[0].strip()
+        return first_line if first_line else "Unknown authentication error"
 
     def is_authenticated(self, profile: str) -> bool:
         """Check if a profile is currently authenticated."""
         return self.authenticated_profiles.get(profile, False)
 
+    def get_authenticated_set(self) -> set[str]:
+        """Get the names of all currently authenticated profiles."""
+        return {profile for profile, authenticated in self.authenticated_profiles.items() if authenticated}
+
     def logout(self, profile: str) -> None:
         """Mark a profile as logged out."""
         if profile in self.authenticated_profiles:
@@ -1,15 +1,46 @@
 """AWS credentials management and validation for AWS ADFS GUI."""
 
 import asyncio
-import configparser
-import json
+import functools
+import importlib.util
 import os
+import re
+import sys
+import time
+from collections import Counter
+from collections.abc import Hashable
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from .models import AWSProfile
 
+# INI section headers, e.g. "[default]" or "[profile dev]"
+_SECTION_RE = re.compile(rb"^\[([^\]\r\n]+)\]", re.MULTILINE)
+
+# STS error codes that identify expired or rejected credentials, matched in one scan
+_STS_ERROR_RE = re.compile(
+    r"(?P<expired>ExpiredToken|TokenRefreshRequired)|(?P<invalid>InvalidUserID\.NotFound|AccessDenied)"
+)
+
+# boto3 is a core dependency; the AWS CLI is only used if it cannot be imported
+_BOTO3_AVAILABLE = importlib.util.find_spec("boto3") is not None
+
+
+# Two entries: the current and previous second, so calls straddling a boundary (or a
+# small wall-clock step back) don't keep evicting each other
+@functools.lru_cache(maxsize=2)
+def _iso_timestamp(second: int) -> str:
+    """Format a Unix second as an ISO-8601 UTC timestamp."""
+    return datetime.fromtimestamp(second, UTC).isoformat()
+
+
+def _utc_now_iso() -> str:
+    """Return the current UTC time, formatted once per wall-clock second."""
+    return _iso_timestamp(int(time.time()))
+
 
 class CredentialStatus:
     """Represents the status of AWS credentials for a profile."""
@@ -54,6 +85,12 @@ class CredentialStatus:
         },
     }
 
+    # (label, color, icon, priority) per status, unpacked once per status result
+    _STATUS_TUPLES: dict[str, tuple[str, str, str, int]] = {
+        status: (config["label"], config["color"], config["icon"], config["priority"])
+        for status, config in STATUS_CONFIG.items()
+    }
+
 
 class AWSCredentialsManager:
     """Manages AWS credentials validation and status detection."""
@@ -63,21 +100,38 @@ class AWSCredentialsManager:
         self.credentials_file = self.aws_dir / "credentials"
         self.config_file = self.aws_dir / "config"
         self.profile_status: dict[str, dict[str, Any]] = {}
-
-    async def validate_all_profiles(self, profiles: list[AWSProfile]) -> dict[str, dict[str, Any]]:
+        # Section names per file, keyed by the (mtime, size) they were parsed at
+        self._profile_set_cache: dict[Path, tuple[tuple[int, int], frozenset[str]]] = {}
+        # Recent STS results per profile as (monotonic time, (success, stdout, stderr))
+        self._sts_cache: dict[str, tuple[float, tuple[bool, str, str]]] = {}
+        self._sts_ttl = 60.0
+        self._sts_timeout = 10.0
+        self._use_boto3 = _BOTO3_AVAILABLE
+        # boto3 sessions per profile with the credentials file (mtime, size) they were created at;
+        # botocore reads the shared files once per session, so a changed file needs a new one
+        self._sessions: dict[str, tuple[tuple[int, int] | None, Any]] = {}
+
+    async def validate_all_profiles(
+        self, profiles: list[AWSProfile], concurrency: int = 8
+    ) -> dict[str, dict[str, Any]]:
         """
         Validate credentials for all profiles concurrently.
 
         Args:
             profiles: List of AWS profiles to validate
+            concurrency: Maximum number of STS subprocesses running at once (1 validates sequentially)
 
         Returns:
             Dictionary mapping profile names to status information
         """
-        # Run validations concurrently for better performance
-        tasks = [self._validate_profile_credentials(profile.name) for profile in profiles]
+        # Each validation spawns an AWS CLI subprocess; cap how many run at once
+        semaphore = asyncio.Semaphore(max(1, min(len(profiles), concurrency)))
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def _validate(profile_name: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._validate_profile_credentials(profile_name)
+
+        results = await asyncio.gather(*(_validate(profile.name) for profile in profiles), return_exceptions=True)
 
         # Process results
         for profile, result in zip(profiles, results, strict=False):
@@ -85,7 +139,7 @@ class AWSCredentialsManager:
                 self.profile_status[profile.name] = {
                     "status": CredentialStatus.UNKNOWN,
                     "message": f"Validation error: {str(result)}",
-                    "last_checked": datetime.now(UTC).isoformat(),
+                    "last_checked": _utc_now_iso(),
                     "profile_info": profile,
                     **CredentialStatus.STATUS_CONFIG[CredentialStatus.UNKNOWN],
                 }
@@ -121,13 +175,14 @@ class AWSCredentialsManager:
                     CredentialStatus.VALID, f"Credentials active for {profile_name}", extra_info=expiration_info
                 )
             else:
-                # Determine specific error type
-                if "ExpiredToken" in error or "TokenRefreshRequired" in error:
+                # Determine specific error type; expiry wins if both kinds appear
+                categories = {match.lastgroup for match in _STS_ERROR_RE.finditer(error)}
+                if "expired" in categories:
                     return self._create_status_result(
                         CredentialStatus.EXPIRED,
                         f"Credentials expired for {profile_name}. Please refresh with aws-adfs.",
                     )
-                elif "InvalidUserID.NotFound" in error or "AccessDenied" in error:
+                elif "invalid" in categories:
                     return self._create_status_result(
                         CredentialStatus.INVALID, f"Invalid credentials for {profile_name}. Please re-authenticate."
                     )
@@ -141,38 +196,104 @@ class AWSCredentialsManager:
                 CredentialStatus.UNKNOWN, f"Validation error for {profile_name}: {str(e)}"
             )
 
+    def _load_profiles(self, path: Path) -> frozenset[str]:
+        """Return the section names in an AWS INI file, re-parsing only when it changes."""
+        # EAFP: a missing file costs one failed stat, an unchanged one a single stat
+        try:
+            stat = path.stat()
+        except OSError:
+            self._profile_set_cache.pop(path, None)
+            return frozenset()
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._profile_set_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            # Removed between the stat and the read
+            self._profile_set_cache.pop(path, None)
+            return frozenset()
+
+        # Scan the raw bytes and decode only the (short) header names
+        sections = frozenset(name.decode() for name in _SECTION_RE.findall(data))
+        self._profile_set_cache[path] = (key, sections)
+        return sections
+
     def _profile_exists_in_config(self, profile_name: str) -> bool:
         """Check if profile exists in AWS config files."""
-        # Check credentials file
-        if self.credentials_file.exists():
-            credentials_config = configparser.ConfigParser()
-            credentials_config.read(self.credentials_file)
-            if profile_name in credentials_config.sections():
-                return True
-
-        # Check config file
-        if self.config_file.exists():
-            config = configparser.ConfigParser()
-            config.read(self.config_file)
-
-            # Check for profile section (could be 'profile name' or just 'name')
-            if profile_name in config.sections():
-                return True
-            if f"profile {profile_name}" in config.sections():
-                return True
-
-        return False
+        if profile_name in self._load_profiles(self.credentials_file):
+            return True
+
+        # Config file sections may be 'profile name' or just 'name'
+        config_sections = self._load_profiles(self.config_file)
+        return profile_name in config_sections or f"profile {profile_name}" in config_sections
 
     async def _test_aws_credentials(self, profile_name: str) -> tuple[bool, str, str]:
         """
         Test AWS credentials by calling AWS STS get-caller-identity.
 
+        Uses an in-process boto3 STS client, falling back to the AWS CLI if boto3
+        cannot be imported. Results are reused for ``_sts_ttl`` seconds so periodic refreshes
+        don't re-check every profile each time.
+
         Args:
             profile_name: AWS profile name to test
 
         Returns:
             Tuple of (success, stdout, stderr)
         """
+        cached = self._sts_cache.get(profile_name)
+        if cached is not None and time.monotonic() - cached[0] < self._sts_ttl:
+            return cached[1]
+
+        if self._use_boto3:
+            result = await asyncio.to_thread(self._boto3_get_caller_identity, profile_name)
+        else:
+            result = await self._run_sts_get_caller_identity(profile_name)
+        self._sts_cache[profile_name] = (time.monotonic(), result)
+        return result
+
+    def _boto3_get_caller_identity(self, profile_name: str) -> tuple[bool, str, str]:
+        """Call STS get-caller-identity through boto3, mirroring the AWS CLI's output."""
+        import boto3
+        from botocore.config import Config
+
+        try:
+            file_key = self._credentials_file_key()
+            cached = self._sessions.get(profile_name)
+            if cached is not None and cached[0] == file_key:
+                session = cached[1]
+            else:
+                # New or re-written credentials (e.g. an ``aws-adfs login`` outside the GUI)
+                session = boto3.Session(profile_name=profile_name)
+                self._sessions[profile_name] = (file_key, session)
+
+            client = session.client(
+                "sts",
+                config=Config(
+                    connect_timeout=self._sts_timeout, read_timeout=self._sts_timeout, retries={"max_attempts": 1}
+                ),
+            )
+            identity = client.get_caller_identity()
+            data = {key: identity[key] for key in ("UserId", "Account", "Arn") if key in identity}
+            return (True, orjson.dumps(data).decode(), "")
+        except Exception as e:
+            # botocore errors read like the CLI's, e.g. "An error occurred (ExpiredToken) ..."
+            return (False, "", str(e))
+
+    def _credentials_file_key(self) -> tuple[int, int] | None:
+        """Return the credentials file's (mtime, size), or None if it doesn't exist."""
+        try:
+            stat = self.credentials_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    async def _run_sts_get_caller_identity(self, profile_name: str) -> tuple[bool, str, str]:
+        """Run ``aws sts get-caller-identity`` for a profile."""
         try:
             # Use AWS CLI to test credentials with timeout
             cmd = ["aws", "sts", "get-caller-identity", "--profile", profile_name, "--output", "json"]
@@ -182,20 +303,16 @@ class AWSCredentialsManager:
             )
 
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=10.0,  # 10 second timeout
-                )
-
-                stdout_str = stdout.decode("utf-8") if stdout else ""
-                stderr_str = stderr.decode("utf-8") if stderr else ""
-
-                return (process.returncode == 0, stdout_str, stderr_str)
-
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self._sts_timeout)
             except TimeoutError:
-                process.kill()
-                await process.wait()
                 return (False, "", "AWS CLI call timed out")
+            finally:
+                # Never leave the CLI running, whatever interrupted the read
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+            return (process.returncode == 0, stdout.decode("utf-8"), stderr.decode("utf-8"))
 
         except FileNotFoundError:
             return (False, "", "AWS CLI not found. Please install: pip install awscli")
@@ -205,31 +322,40 @@ class AWSCredentialsManager:
     def _parse_credentials_info(self, aws_output: str) -> dict[str, Any]:
         """Parse AWS STS output for credential information."""
         try:
-            data = json.loads(aws_output)
+            data = orjson.loads(aws_output)
             return {
                 "account_id": data.get("Account"),
                 "user_id": data.get("UserId"),
                 "arn": data.get("Arn"),
-                "last_validated": datetime.now(UTC).isoformat(),
+                "last_validated": _utc_now_iso(),
             }
-        except (json.JSONDecodeError, KeyError):
-            return {"last_validated": datetime.now(UTC).isoformat()}
+        except (orjson.JSONDecodeError, KeyError):
+            return {"last_validated": _utc_now_iso()}
 
     def _create_status_result(
         self, status: str, message: str, extra_info: dict[str, Any] | None = None
     ) -> dict[str, Any]:
         """Create a standardized status result dictionary."""
-        result = {
+        label, color, icon, priority = CredentialStatus._STATUS_TUPLES[status]
+        return {
             "status": status,
             "message": message,
-            "last_checked": datetime.now(UTC).isoformat(),
-            **CredentialStatus.STATUS_CONFIG[status],
+            "last_checked": _utc_now_iso(),
+            "label": label,
+            "color": color,
+            "icon": icon,
+            "priority": priority,
+            **(extra_info or {}),
         }
 
-        if extra_info:
-            result.update(extra_info)
-
-        return result
+    def invalidate(self, profile_name: str | None = None) -> None:
+        """Drop cached STS results for one profile, or for all profiles if none is given."""
+        if profile_name is None:
+            self._sts_cache.clear()
+            self._sessions.clear()
+        else:
+            self._sts_cache.pop(profile_name, None)
+            self._sessions.pop(profile_name, None)
 
     def get_profile_status(self, profile_name: str) -> dict[str, Any]:
         """Get the current status of a specific profile."""
@@ -248,15 +374,118 @@ class AWSCredentialsManager:
 
     def get_status_summary(self) -> dict[str, int]:
         """Get a summary count of profiles by status."""
-        summary = {}
-        for status_info in self.profile_status.values():
-            status = status_info.get("status", CredentialStatus.UNKNOWN)
-            summary[status] = summary.get(status, 0) + 1
-        return summary
+        return dict(
+            Counter(status_info.get("status", CredentialStatus.UNKNOWN) for status_info in self.profile_status.values())
+        )
+
+
+# Command words and standalone flags, interned once and shared by every built argv
+_AWS_ADFS_LOGIN = (sys.intern("aws-adfs"), sys.intern("login"))
+_AWS = sys.intern("aws")
+_FLAG_ENV = sys.intern("--env")
+_FLAG_NO_SSPI = sys.intern("--no-sspi")
+_FLAG_PROFILE = sys.intern("--profile")
+_FLAG_REGION = sys.intern("--region")
+_FLAG_OUTPUT = sys.intern("--output")
+_FLAG_ENDPOINT_URL = sys.intern("--endpoint-url")
+
+
+# Option items as (name, value type, value); see _freeze_options
+_FrozenOptions = tuple[tuple[str, type, Hashable], ...]
+
+
+def _freeze_options(options: dict[str, Any]) -> _FrozenOptions:
+    """Turn command options into a canonical, hashable cache key.
+
+    Each value is keyed with its type: 3600 == 3600.0 and 1 == True hash alike,
+    but render differently in the built argv.
+    """
+    return tuple(
+        sorted((key, type(value), tuple(value) if isinstance(value, list) else value) for key, value in options.items())
+    )
+
+
+def _thaw_options(frozen_opts: _FrozenOptions) -> dict[str, Any]:
+    """Turn a _freeze_options key back into an options dict."""
+    return {key: value for key, _, value in frozen_opts}
+
+
+def _cached_build(build: "functools._lru_cache_wrapper[tuple[str, ...]]", *args: Any) -> list[str]:
+    """Call a cached builder, bypassing the cache for unhashable option values."""
+    try:
+        return list(build(*args))
+    except TypeError:
+        return list(build.__wrapped__(*args))
+
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _build_aws_adfs_tuple(profile_name: str, adfs_host: str, frozen_opts: _FrozenOptions) -> tuple[str, ...]:
+    """Build the aws-adfs login argv for already merged options."""
+    options = _thaw_options(frozen_opts)
+    cmd = list(_AWS_ADFS_LOGIN)
+
+    # Required parameters
+    cmd.extend([f"--profile={profile_name}"])
+    cmd.extend([f"--adfs-host={adfs_host}"])
+
+    # Add optional flags
+    if options.get("env_mode", True):
+        cmd.append(_FLAG_ENV)
+
+    if options.get("no_sspi", True):
+        cmd.append(_FLAG_NO_SSPI)
+
+    if options.get("region"):
+        cmd.extend([f"--region={options['region']}"])
+
+    if options.get("output_format"):
+        cmd.extend([f"--output-format={options['output_format']}"])
+
+    if options.get("duration"):
+        cmd.extend([f"--duration={options['duration']}"])
+
+    if options.get("assertion_duration"):
+        cmd.extend([f"--assertion-duration={options['assertion_duration']}"])
+
+    # Add any custom arguments
+    if options.get("custom_args"):
+        cmd.extend(options["custom_args"])
+
+    return tuple(cmd)
+
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _build_aws_cli_tuple(base_command: str, profile_name: str, frozen_opts: _FrozenOptions) -> tuple[str, ...]:
+    """Build an AWS CLI argv."""
+    options = _thaw_options(frozen_opts)
+    cmd = [_AWS, *base_command.split()]
+
+    # Add profile
+    cmd.extend((_FLAG_PROFILE, profile_name))
+
+    # Add optional parameters
+    if options.get("region"):
+        cmd.extend((_FLAG_REGION, options["region"]))
+
+    if options.get("output"):
+        cmd.extend((_FLAG_OUTPUT, options["output"]))
+
+    if options.get("endpoint_url"):
+        cmd.extend((_FLAG_ENDPOINT_URL, options["endpoint_url"]))
+
+    # Add any additional arguments
+    if options.get("extra_args"):
+        cmd.extend(options["extra_args"])
+
+    return tuple(cmd)
 
 
 class FlexibleCommandBuilder:
-    """Builds flexible AWS commands with customizable options."""
+    """Builds flexible AWS commands with customizable options.
+
+    Commands are pure functions of their inputs, so the argv for each
+    (profile, host/command, options) key is built once and reused.
+    """
 
     def __init__(self):
         self.default_aws_adfs_options = {
@@ -280,39 +509,9 @@ class FlexibleCommandBuilder:
         Returns:
             List of command arguments
         """
-        cmd = ["aws-adfs", "login"]
-
-        # Required parameters
-        cmd.extend([f"--profile={profile_name}"])
-        cmd.extend([f"--adfs-host={adfs_host}"])
-
-        # Apply options with defaults
+        # Apply options with defaults before keying the cache, so changed defaults are honoured
         merged_options = {**self.default_aws_adfs_options, **options}
-
-        # Add optional flags
-        if merged_options.get("env_mode", True):
-            cmd.append("--env")
-
-        if merged_options.get("no_sspi", True):
-            cmd.append("--no-sspi")
-
-        if merged_options.get("region"):
-            cmd.extend([f"--region={merged_options['region']}"])
-
-        if merged_options.get("output_format"):
-            cmd.extend([f"--output-format={merged_options['output_format']}"])
-
-        if merged_options.get("duration"):
-            cmd.extend([f"--duration={merged_options['duration']}"])
-
-        if merged_options.get("assertion_duration"):
-            cmd.extend([f"--assertion-duration={merged_options['assertion_duration']}"])
-
-        # Add any custom arguments
-        if merged_options.get("custom_args"):
-            cmd.extend(merged_options["custom_args"])
-
-        return cmd
+        return _cached_build(_build_aws_adfs_tuple, profile_name, adfs_host, _freeze_options(merged_options))
 
     def build_aws_cli_command(self, base_command: str, profile_name: str, **options: Any) -> list[str]:
         """
@@ -326,26 +525,7 @@ class FlexibleCommandBuilder:
         Returns:
             List of command arguments
         """
-        cmd = ["aws"] + base_command.split()
-
-        # Add profile
-        cmd.extend(["--profile", profile_name])
-
-        # Add optional parameters
-        if options.get("region"):
-            cmd.extend(["--region", options["region"]])
-
-        if options.get("output"):
-            cmd.extend(["--output", options["output"]])
-
-        if options.get("endpoint_url"):
-            cmd.extend(["--endpoint-url", options["endpoint_url"]])
-
-        # Add any additional arguments
-        if options.get("extra_args"):
-            cmd.extend(options["extra_args"])
-
-        return cmd
+        return _cached_build(_build_aws_cli_tuple, base_command, profile_name, _freeze_options(options))
 
 
 # Global instances
@@ -4,22 +4,69 @@ import asyncio
 import shlex
 import subprocess
 import time
+import uuid
+from collections import deque
 from collections.abc import AsyncGenerator
+from dataclasses import dataclass
 from typing import Any
 
 from .models import AWSProfile, CommandResult, ExecutionStatus
 
 
+@dataclass(slots=True, frozen=True)
+class CommandHistoryEntry:
+    """A single profile's command execution, as kept in the executor history."""
+
+    id: str
+    command: str
+    profile: str
+    success: bool
+    output: str
+    error: str
+    duration: float
+
+    @classmethod
+    def from_result(cls, result: CommandResult) -> "CommandHistoryEntry":
+        """Build a history entry from a command result."""
+        return cls(
+            id=uuid.uuid4().hex,
+            command=result.command,
+            profile=result.profile,
+            success=result.status == ExecutionStatus.SUCCESS,
+            output=result.output,
+            error=result.error,
+            duration=result.duration,
+        )
+
+
 class CommandExecutor:
     """Executes AWS CLI commands across multiple profiles."""
 
-    def __init__(self, timeout: int = 30):
+    __slots__ = ("timeout", "max_history", "command_history")
+
+    def __init__(self, timeout: int = 30, max_history: int = 100):
         """Initialize the command executor.
 
         Args:
             timeout: Command timeout in seconds
+            max_history: Number of most recent results kept in the command history
         """
         self.timeout = timeout
+        self.max_history = max_history
+        # Bounded deque: appending past max_history evicts the oldest entry in O(1)
+        self.command_history: deque[CommandHistoryEntry] = deque(maxlen=max_history)
+
+    def add_to_history(self, entry: CommandHistoryEntry) -> None:
+        """Record a command execution in the history."""
+        self.command_history.append(entry)
+
+    def get_command_history(self) -> list[CommandHistoryEntry]:
+        """Return a copy of the command history, oldest first."""
+        return list(self.command_history)
+
+    def clear_history(self) -> None:
+        """Clear the command history."""
+        self.command_history.clear()
 
     async def execute_command(
         self,
@@ -1,12 +1,36 @@
 """Configuration management for AWS ADFS GUI."""
 
-import json
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
+import orjson
 from pydantic import BaseModel, Field
 
 from .models import AWSProfile, ProfileGroup
 
+# Built-in profiles as (name, group, region, description), defined once at import
+_DEFAULT_PROFILES_TEMPLATE: tuple[tuple[str, ProfileGroup, str, str], ...] = (
+    ("aws-dev-eu", ProfileGroup.DEV, "eu-west-1", "Development EU"),
+    ("aws-dev-sg", ProfileGroup.DEV, "ap-southeast-1", "Development SG"),
+    ("kds-ets-np", ProfileGroup.NON_PRODUCTION, "us-east-1", "KDS ETS Non-Production"),
+    ("kds-gps-np", ProfileGroup.NON_PRODUCTION, "us-east-1", "KDS GPS Non-Production"),
+    ("kds-iss-np", ProfileGroup.NON_PRODUCTION, "us-east-1", "KDS ISS Non-Production"),
+    ("kds-ets-pd", ProfileGroup.PRODUCTION, "us-east-1", "KDS ETS Production"),
+    ("kds-gps-pd", ProfileGroup.PRODUCTION, "us-east-1", "KDS GPS Production"),
+    ("kds-iss-pd", ProfileGroup.PRODUCTION, "us-east-1", "KDS ISS Production"),
+)
+
+
+def default_profiles() -> dict[ProfileGroup, list[AWSProfile]]:
+    """Build a fresh copy of the built-in profiles, grouped by profile group."""
+    profiles: dict[ProfileGroup, list[AWSProfile]] = {}
+    for name, group, region, description in _DEFAULT_PROFILES_TEMPLATE:
+        profiles.setdefault(group, []).append(
+            AWSProfile(name=name, group=group, region=region, description=description)
+        )
+    return profiles
+
 
 class ConfigModel(BaseModel):
     """Configuration model for the application."""
@@ -18,6 +42,38 @@ class ConfigModel(BaseModel):
     default_region: str = Field(default="us-east-1")
 
 
+def _config_to_dict(config: ConfigModel) -> dict[str, Any]:
+    """Convert a config model to its JSON file layout."""
+    # Convert profile groups to strings for JSON serialization
+    profiles_dict = {}
+    for group, profile_list in config.profiles.items():
+        profiles_dict[group.value] = [profile.model_dump() for profile in profile_list]
+
+    return {
+        "profiles": profiles_dict,
+        "default_command": config.default_command,
+        "max_history": config.max_history,
+        "timeout": config.timeout,
+        "default_region": config.default_region,
+    }
+
+
+# The default config file never changes, so serialize it once at import
+_DEFAULT_CONFIG_BYTES = orjson.dumps(
+    _config_to_dict(ConfigModel(profiles=default_profiles())), option=orjson.OPT_INDENT_2
+)
+
+
+@dataclass(slots=True, frozen=True)
+class _ProfileSnapshot:
+    """Profiles parsed from one version of the config file."""
+
+    key: tuple[int, int] | None  # (st_mtime_ns, st_size) of the file that was read
+    profiles: dict[ProfileGroup, list[AWSProfile]]
+    by_name: dict[str, AWSProfile]
+    names: frozenset[str]
+
+
 class ConfigManager:
     """Manages application configuration."""
 
@@ -25,64 +81,7 @@ class ConfigManager:
         self.config_dir = config_dir or Path.home() / ".aws" / "gui"
         self.config_file = self.config_dir / "config.json"
         self.config_dir.mkdir(parents=True, exist_ok=True)
-
-        # Initialize default profiles
-        self.default_profiles = {
-            ProfileGroup.DEV: [
-                AWSProfile(
-                    name="aws-dev-eu",
-                    group=ProfileGroup.DEV,
-                    region="eu-west-1",
-                    description="Development EU",
-                ),
-                AWSProfile(
-                    name="aws-dev-sg",
-                    group=ProfileGroup.DEV,
-                    region="ap-southeast-1",
-                    description="Development SG",
-                ),
-            ],
-            ProfileGroup.NON_PRODUCTION: [
-                AWSProfile(
-                    name="kds-ets-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ETS Non-Production",
-                ),
-                AWSProfile(
-                    name="kds-gps-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS GPS Non-Production",
-                ),
-                AWSProfile(
-                    name="kds-iss-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ISS Non-Production",
-                ),
-            ],
-            ProfileGroup.PRODUCTION: [
-                AWSProfile(
-                    name="kds-ets-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ETS Production",
-                ),
-                AWSProfile(
-                    name="kds-gps-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS GPS Production",
-                ),
-                AWSProfile(
-                    name="kds-iss-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ISS Production",
-                ),
-            ],
-        }
+        self._snapshot: _ProfileSnapshot | None = None
 
     def load_config(self) -> ConfigModel:
         """Load configuration from file."""
@@ -90,14 +89,13 @@ class ConfigManager:
             return self._create_default_config()
 
         try:
-            with open(self.config_file, encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(self.config_file.read_bytes())
 
             # Convert profile groups from strings to enums
             profiles = {}
             for group_str, profile_list in data.get("profiles", {}).items():
                 group = ProfileGroup(group_str)
-                profiles[group] = [AWSProfile(**profile) for profile in profile_list]
+                profiles[group] = [AWSProfile.model_validate(profile) for profile in profile_list]
 
             return ConfigModel(
                 profiles=profiles,
@@ -106,47 +104,98 @@ class ConfigManager:
                 timeout=data.get("timeout", 30),
                 default_region=data.get("default_region", "us-east-1"),
             )
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+        except (orjson.JSONDecodeError, KeyError, ValueError) as e:
             print(f"Error loading config: {e}")
             return self._create_default_config()
 
     def save_config(self, config: ConfigModel) -> None:
         """Save configuration to file."""
-        # Convert profile groups to strings for JSON serialization
-        profiles_dict = {}
-        for group, profile_list in config.profiles.items():
-            profiles_dict[group.value] = [profile.model_dump() for profile in profile_list]
-
-        data = {
-            "profiles": profiles_dict,
-            "default_command": config.default_command,
-            "max_history": config.max_history,
-            "timeout": config.timeout,
-            "default_region": config.default_region,
-        }
-
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        self.config_file.write_bytes(orjson.dumps(_config_to_dict(config), option=orjson.OPT_INDENT_2))
+        # A rewrite within the filesystem's timestamp granularity may keep the same key
+        self._snapshot = None
 
     def _create_default_config(self) -> ConfigModel:
         """Create default configuration."""
-        config = ConfigModel(profiles=self.default_profiles.copy())
-        self.save_config(config)
-        return config
+        self.config_file.write_bytes(_DEFAULT_CONFIG_BYTES)
+        self._snapshot = None
+        return ConfigModel(profiles=default_profiles())
+
+    def _file_key(self) -> tuple[int, int] | None:
+        """Return the config file's (st_mtime_ns, st_size), or None if it can't be read."""
+        try:
+            stat = self.config_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _current_snapshot(self) -> _ProfileSnapshot:
+        """Get the parsed profiles, re-reading the config file only when it changes on disk."""
+        # Stat before reading, so an edit made mid-read shows up as a change next time
+        key = self._file_key()
+        snapshot = self._snapshot
+        if snapshot is not None and key is not None and snapshot.key == key:
+            return snapshot
+
+        profiles = self.load_config().profiles
+        if key is None:
+            # load_config has just written the defaults
+            key = self._file_key()
+        by_name = {profile.name: profile for profile_list in profiles.values() for profile in profile_list}
+        snapshot = self._snapshot = _ProfileSnapshot(key, profiles, by_name, frozenset(by_name))
+        return snapshot
 
     def get_profiles_by_group(self, group: ProfileGroup) -> list[AWSProfile]:
         """Get profiles for a specific group."""
-        config = self.load_config()
-        return config.profiles.get(group, [])
+        return list(self._current_snapshot().profiles.get(group, ()))
 
     def get_all_profiles(self) -> list[AWSProfile]:
         """Get all profiles."""
-        config = self.load_config()
         all_profiles = []
-        for profile_list in config.profiles.values():
+        for profile_list in self._current_snapshot().profiles.values():
             all_profiles.extend(profile_list)
         return all_profiles
 
+    def get_profiles(self) -> dict[ProfileGroup, list[AWSProfile]]:
+        """Get all profiles organized by group.
+
+        Returns fresh lists, so callers can modify the result without touching the cache.
+        """
+        return {group: list(profile_list) for group, profile_list in self._current_snapshot().profiles.items()}
+
+    def get_profile_by_name(self, name: str) -> AWSProfile | None:
+        """Get a profile by name, or None if it doesn't exist."""
+        return self._current_snapshot().by_name.get(name)
+
+    def add_profile(self, profile: AWSProfile) -> None:
+        """Add a profile to its group and persist the configuration."""
+        config = self.load_config()
+        config.profiles.setdefault(profile.group, []).append(profile)
+        self.save_config(config)
+
+    def remove_profile(self, name: str) -> bool:
+        """Remove a profile by name and persist the configuration.
+
+        Returns:
+            True if the profile existed and was removed
+        """
+        profile = self.get_profile_by_name(name)
+        if profile is None:
+            return False
+
+        config = self.load_config()
+        group_profiles = config.profiles.get(profile.group, [])
+        config.profiles[profile.group] = [p for p in group_profiles if p.name != name]
+        self.save_config(config)
+        return True
+
+    def get_profile_names(self) -> list[str]:
+        """Get all profile names as a flat list."""
+        return list(self._current_snapshot().by_name)
+
+    def get_profile_names_set(self) -> frozenset[str]:
+        """Get all profile names as a cached set for membership checks."""
+        return self._current_snapshot().names
+
 
 # Global instance for compatibility
 config = ConfigManager()
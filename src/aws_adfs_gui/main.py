@@ -2,9 +2,7 @@
 
 import sys
 
-import uvicorn
-
-from .web_app import app
+from .web_app import run_app
 
 
 def main() -> None:
@@ -30,12 +28,8 @@ def start_web_server() -> None:
     print("Usage: python -m aws_adfs_gui.main web")
 
     try:
-        uvicorn.run(
-            app,
-            host="0.0.0.0",
-            port=8000,
-            log_level="info",
-        )
+        # run_app picks granian or uvicorn with uvloop, as described in the README
+        run_app(host="0.0.0.0", port=8000, reload=False)
     except KeyboardInterrupt:
         print("\nShutting down...")
     except Exception as e:
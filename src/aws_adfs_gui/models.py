@@ -1,11 +1,11 @@
 """Data models for AWS ADFS GUI application."""
 
-from enum import Enum
+from enum import StrEnum
 
 from pydantic import BaseModel, Field, SecretStr
 
 
-class ProfileGroup(str, Enum):
+class ProfileGroup(StrEnum):
     """AWS profile groups."""
 
     DEV = "dev"
@@ -13,7 +13,7 @@ class ProfileGroup(str, Enum):
     PRODUCTION = "pd"
 
 
-class ExecutionStatus(str, Enum):
+class ExecutionStatus(StrEnum):
     """Command execution status."""
 
     SUCCESS = "success"
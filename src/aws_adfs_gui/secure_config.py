@@ -9,6 +9,7 @@ from typing import Any
 from cryptography.fernet import Fernet
 from pydantic import BaseModel, Field, SecretStr
 
+from .config import default_profiles
 from .models import AWSProfile, ProfileGroup
 
 
@@ -42,64 +43,6 @@ class SecureConfigManager:
         self.key_file = self.config_dir / "encryption.key"
         self.config_dir.mkdir(parents=True, exist_ok=True)
 
-        # Initialize default profiles
-        self.default_profiles = {
-            ProfileGroup.DEV: [
-                AWSProfile(
-                    name="aws-dev-eu",
-                    group=ProfileGroup.DEV,
-                    region="eu-west-1",
-                    description="Development EU",
-                ),
-                AWSProfile(
-                    name="aws-dev-sg",
-                    group=ProfileGroup.DEV,
-                    region="ap-southeast-1",
-                    description="Development SG",
-                ),
-            ],
-            ProfileGroup.NON_PRODUCTION: [
-                AWSProfile(
-                    name="kds-ets-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ETS Non-Production",
-                ),
-                AWSProfile(
-                    name="kds-gps-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS GPS Non-Production",
-                ),
-                AWSProfile(
-                    name="kds-iss-np",
-                    group=ProfileGroup.NON_PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ISS Non-Production",
-                ),
-            ],
-            ProfileGroup.PRODUCTION: [
-                AWSProfile(
-                    name="kds-ets-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ETS Production",
-                ),
-                AWSProfile(
-                    name="kds-gps-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS GPS Production",
-                ),
-                AWSProfile(
-                    name="kds-iss-pd",
-                    group=ProfileGroup.PRODUCTION,
-                    region="us-east-1",
-                    description="KDS ISS Production",
-                ),
-            ],
-        }
-
         # Initialize encryption
         self._fernet: Fernet | None = None
         self._ensure_encryption_key()
@@ -178,6 +121,10 @@ class SecureConfigManager:
 
             with open(self.config_file, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
+
+            # The file holds the encrypted credentials; restrict it like the key file
+            if platform.system() != "Windows":
+                os.chmod(self.config_file, 0o600)
         except OSError as e:
             raise RuntimeError(f"Failed to save secure config: {e}") from e
 
@@ -240,7 +187,7 @@ class SecureConfigManager:
 
     def _create_default_config(self) -> SecureConfig:
         """Create default secure configuration."""
-        config = SecureConfig(profiles=self.default_profiles.copy())
+        config = SecureConfig(profiles=default_profiles())
         self.save_config(config)
         return config
 
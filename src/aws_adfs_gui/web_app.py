@@ -1,23 +1,30 @@
 """FastAPI web application for AWS ADFS GUI."""
 
-import json
+import asyncio
+import csv
+import importlib.util
+import io
 import os
+import platform
+import weakref
+from collections.abc import Awaitable, Callable, Iterator
 
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import SecretStr
 
 from .adfs_auth import authenticator
 from .aws_credentials import command_builder, credentials_manager
-from .command_executor import executor
+from .command_executor import CommandExecutor, CommandHistoryEntry, executor
 from .config import config
 from .models import (
     ADFSCredentials,
     AuthenticationRequest,
     AWSProfile,
-    CommandRequest,
     CommandResult,
     ConfigResponse,
     ConfigSaveRequest,
@@ -28,24 +35,76 @@ from .models import (
 )
 from .secure_config import secure_config_manager
 
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: object) -> bytes:
+        return orjson.dumps(content)
+
+
 app = FastAPI(
     title="AWS ADFS GUI",
     description="Web-based GUI for executing AWS commands across multiple profiles",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify actual origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # The frontend uses no cookies or auth headers, and browsers ignore credentials with a wildcard origin
+    allow_credentials=False,
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # Mount static files for the frontend
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
+INDEX_PATH = os.path.join(static_dir, "index.html")
+
+
+# Pre-built connection_status frames; only the profile, status and message vary
+_STATUS_TEMPLATE = b'{"type":"connection_status","profile":%s,"status":%s}'
+_STATUS_MESSAGE_TEMPLATE = b'{"type":"connection_status","profile":%s,"status":%s,"message":%s}'
+
+
+def _connection_status(profile: str, status: str, message: str | None = None) -> bytes:
+    """Serialize a connection_status message without building a dict."""
+    if message is None:
+        return _STATUS_TEMPLATE % (orjson.dumps(profile), orjson.dumps(status))
+    return _STATUS_MESSAGE_TEMPLATE % (orjson.dumps(profile), orjson.dumps(status), orjson.dumps(message))
+
+
+def _disconnected_status(profile: str, message: str) -> bytes:
+    """Serialize a "disconnected" connection_status message."""
+    return _connection_status(profile, "disconnected", message)
+
+
+_COMMAND_RESULT_TEMPLATE = b'{"type":"command_result","profile":%s,"result":%s}'
+
+
+def _command_result(profile: str, result: CommandResult) -> bytes:
+    """Serialize a command_result message, embedding the model's JSON as-is."""
+    return _COMMAND_RESULT_TEMPLATE % (orjson.dumps(profile), result.__pydantic_serializer__.to_json(result))
+
+
+_COMMAND_ERROR_TEMPLATE = b'{"type":"command_error","profile":%s,"error":%s}'
+
+
+def _command_error(profile: str, error: str) -> bytes:
+    """Serialize a command_error message without building a dict."""
+    return _COMMAND_ERROR_TEMPLATE % (orjson.dumps(profile), orjson.dumps(error))
+
+
+# How long a connection's writer waits for more messages before flushing a batch
+_SEND_FLUSH_WINDOW = 0.001
+# Largest number of messages coalesced into a single frame
+_SEND_MAX_BATCH = 32
+# Messages buffered per connection before senders are held back (or broadcasts drop the client)
+_SEND_QUEUE_SIZE = 256
 
 
 # WebSocket connection manager
@@ -53,80 +112,145 @@ class ConnectionManager:
     """Manages WebSocket connections and profile states."""
 
     def __init__(self) -> None:
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
         self.connected_profiles: set[str] = set()
         self.profile_connections: dict[str, set[WebSocket]] = {}
+        # Reverse of profile_connections so disconnect only touches this socket's profiles
+        self.ws_to_profiles: dict[WebSocket, set[str]] = {}
+        self.send_queues: dict[WebSocket, asyncio.Queue[bytes]] = {}
+        self.writer_tasks: dict[WebSocket, asyncio.Task[None]] = {}
+        # Sockets already known to be closed; weak so finished connections can be collected
+        self._dead: weakref.WeakSet[WebSocket] = weakref.WeakSet()
+        # Pending close() calls for evicted sockets, kept referenced until they finish
+        self._close_tasks: set[asyncio.Task[None]] = set()
 
     async def connect(self, websocket: WebSocket) -> None:
-        """Accept a WebSocket connection."""
+        """Accept a WebSocket connection and start its writer task."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
+        self.send_queues[websocket] = queue
+        self.writer_tasks[websocket] = asyncio.create_task(self._writer(websocket, queue))
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self._dead.add(websocket)
+        self.active_connections.discard(websocket)
+        queue = self.send_queues.pop(websocket, None)
+        if queue is not None:
+            # Nothing drains the queue any more; empty it so senders waiting on a full queue return
+            while not queue.empty():
+                queue.get_nowait()
+        writer = self.writer_tasks.pop(websocket, None)
+        if writer is not None:
+            writer.cancel()
 
         # Remove from profile connections
-        for connections in self.profile_connections.values():
-            if websocket in connections:
-                connections.remove(websocket)
+        for profile in self.ws_to_profiles.pop(websocket, ()):
+            connections = self.profile_connections.get(profile)
+            if connections is not None:
+                connections.discard(websocket)
+
+    def _evict(self, websocket: WebSocket) -> None:
+        """Drop a connection that failed or can't keep up, and close it so the client reconnects."""
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close(websocket))
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        """Close a socket with 1013 (try again later), ignoring sockets that are already gone."""
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue[bytes]) -> None:
+        """Drain a connection's queue, coalescing messages that arrive together into one array frame."""
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(_SEND_FLUSH_WINDOW)
+            while not queue.empty() and len(batch) < _SEND_MAX_BATCH:
+                batch.append(queue.get_nowait())
+
+            try:
+                await websocket.send_bytes(b"[" + b",".join(batch) + b"]")
+            except Exception:
+                # Connection might be closed
+                self.disconnect(websocket)
+                return
 
     async def send_personal_message(self, message: dict, websocket: WebSocket) -> None:
         """Send a message to a specific WebSocket."""
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception:
+        await self.send_personal_bytes(orjson.dumps(message), websocket)
+
+    async def send_personal_bytes(self, payload: bytes, websocket: WebSocket) -> None:
+        """Send an already-serialized JSON message to a specific WebSocket."""
+        if websocket in self._dead:
+            return
+
+        # Wait for room in the queue, so a slow client slows down the command producing its output
+        if not await self._try_send(payload, websocket, wait=True):
             # Connection might be closed
             self.disconnect(websocket)
 
+    async def _try_send(self, payload: bytes, websocket: WebSocket, wait: bool = False) -> bool:
+        """Queue or send a message, returning False if the connection is dead or can't keep up."""
+        queue = self.send_queues.get(websocket)
+        if queue is not None:
+            if wait:
+                await queue.put(payload)
+                return True
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                return False
+            return True
+
+        try:
+            await websocket.send_bytes(payload)
+        except Exception:
+            return False
+        return True
+
     async def broadcast(self, message: dict) -> None:
         """Broadcast a message to all connected WebSockets."""
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                # Connection might be closed
-                self.disconnect(connection)
+        await self.broadcast_bytes(orjson.dumps(message))
+
+    async def broadcast_bytes(self, payload: bytes) -> None:
+        """Broadcast an already-serialized JSON message to all connected WebSockets."""
+        connections = list(self.active_connections)
+        # Fan the sends out so one slow client doesn't hold up the rest
+        sent = await asyncio.gather(*(self._try_send(payload, connection) for connection in connections))
+
+        # Prune failed connections once, after the fan-out, instead of mutating mid-iteration
+        for connection, ok in zip(connections, sent, strict=True):
+            if not ok:
+                self._evict(connection)
 
     async def connect_profile(self, profile: str, websocket: WebSocket, credentials: dict | None = None) -> None:
         """Connect a profile and notify the client."""
-        if profile not in self.profile_connections:
-            self.profile_connections[profile] = set()
-
-        self.profile_connections[profile].add(websocket)
+        self.profile_connections.setdefault(profile, set()).add(websocket)
+        self.ws_to_profiles.setdefault(websocket, set()).add(profile)
 
         # Send connecting status
-        await self.send_personal_message(
-            {"type": "connection_status", "profile": profile, "status": "connecting"},
-            websocket,
-        )
+        await self.send_personal_bytes(_connection_status(profile, "connecting"), websocket)
 
         try:
             # Check if profile is valid
-            if profile not in config.get_profile_names():
-                await self.send_personal_message(
-                    {
-                        "type": "connection_status",
-                        "profile": profile,
-                        "status": "disconnected",
-                        "message": f"Profile '{profile}' not found in configuration",
-                    },
-                    websocket,
+            if profile not in config.get_profile_names_set():
+                await self.send_personal_bytes(
+                    _disconnected_status(profile, f"Profile '{profile}' not found in configuration"), websocket
                 )
                 return
 
             # Check if already authenticated
             if authenticator.is_authenticated(profile):
                 self.connected_profiles.add(profile)
-                await self.send_personal_message(
-                    {
-                        "type": "connection_status",
-                        "profile": profile,
-                        "status": "connected",
-                        "message": f"Profile '{profile}' already authenticated",
-                    },
-                    websocket,
+                await self.send_personal_bytes(
+                    _connection_status(profile, "connected", f"Profile '{profile}' already authenticated"), websocket
                 )
                 return
 
@@ -138,120 +262,83 @@ class ConnectionManager:
                         # Load stored credentials
                         stored_creds = secure_config_manager.load_credentials()
                         if not stored_creds:
-                            await self.send_personal_message(
-                                {
-                                    "type": "connection_status",
-                                    "profile": profile,
-                                    "status": "disconnected",
-                                    "message": "No stored credentials found",
-                                },
-                                websocket,
+                            await self.send_personal_bytes(
+                                _disconnected_status(profile, "No stored credentials found"), websocket
                             )
                             return
 
                         adfs_creds = stored_creds
                     else:
-                        # Use provided credentials
-                        adfs_creds = ADFSCredentials(
-                            username=credentials.get("username", ""),
-                            password=credentials.get("password", ""),
-                            adfs_host=credentials.get("adfs_host", ""),
+                        # Use provided credentials; the message was already checked at the
+                        # WebSocket boundary, so skip pydantic re-validation here
+                        adfs_creds = ADFSCredentials.model_construct(
+                            username=str(credentials.get("username", "")),
+                            password=SecretStr(str(credentials.get("password", ""))),
+                            adfs_host=str(credentials.get("adfs_host", "")),
                             certificate_path=credentials.get("certificate_path"),
                         )
 
-                    settings = ConnectionSettings(
-                        timeout=credentials.get("timeout", 30),
-                        retries=credentials.get("retries", 3),
-                        no_sspi=credentials.get("no_sspi", True),
-                        env_mode=credentials.get("env_mode", True),
+                    settings = ConnectionSettings.model_construct(
+                        timeout=int(credentials.get("timeout", 30)),
+                        retries=int(credentials.get("retries", 3)),
+                        no_sspi=bool(credentials.get("no_sspi", True)),
+                        env_mode=bool(credentials.get("env_mode", True)),
                     )
 
-                    auth_request = AuthenticationRequest(profile=profile, credentials=adfs_creds, settings=settings)
+                    auth_request = AuthenticationRequest.model_construct(
+                        profile=profile, credentials=adfs_creds, settings=settings
+                    )
 
                     # Perform authentication
                     success, message = await authenticator.authenticate(auth_request)
 
                     if success:
                         self.connected_profiles.add(profile)
-                        await self.send_personal_message(
-                            {
-                                "type": "connection_status",
-                                "profile": profile,
-                                "status": "connected",
-                                "message": message,
-                            },
-                            websocket,
-                        )
+                        await self.send_personal_bytes(_connection_status(profile, "connected", message), websocket)
                     else:
-                        await self.send_personal_message(
-                            {
-                                "type": "connection_status",
-                                "profile": profile,
-                                "status": "disconnected",
-                                "message": message,
-                            },
-                            websocket,
-                        )
+                        await self.send_personal_bytes(_disconnected_status(profile, message), websocket)
 
                 except Exception as e:
-                    await self.send_personal_message(
-                        {
-                            "type": "connection_status",
-                            "profile": profile,
-                            "status": "disconnected",
-                            "message": f"Authentication error: {str(e)}",
-                        },
-                        websocket,
+                    await self.send_personal_bytes(
+                        _disconnected_status(profile, f"Authentication error: {str(e)}"), websocket
                     )
             else:
                 # No credentials provided - request them
-                await self.send_personal_message(
-                    {
-                        "type": "connection_status",
-                        "profile": profile,
-                        "status": "disconnected",
-                        "message": "Credentials required. Please configure ADFS settings first.",
-                    },
+                await self.send_personal_bytes(
+                    _disconnected_status(profile, "Credentials required. Please configure ADFS settings first."),
                     websocket,
                 )
 
         except Exception as e:
-            await self.send_personal_message(
-                {
-                    "type": "connection_status",
-                    "profile": profile,
-                    "status": "disconnected",
-                    "message": f"Connection error: {str(e)}",
-                },
-                websocket,
-            )
+            await self.send_personal_bytes(_disconnected_status(profile, f"Connection error: {str(e)}"), websocket)
 
     async def disconnect_profile(self, profile: str, websocket: WebSocket | None = None) -> None:
         """Disconnect a profile and notify clients."""
-        if profile in self.connected_profiles:
-            self.connected_profiles.remove(profile)
+        self.connected_profiles.discard(profile)
 
         # Remove WebSocket from profile connections
         if websocket and profile in self.profile_connections:
             self.profile_connections[profile].discard(websocket)
+            self.ws_to_profiles.get(websocket, set()).discard(profile)
 
         # Notify all connections about disconnection
-        await self.broadcast(
-            {
-                "type": "connection_status",
-                "profile": profile,
-                "status": "disconnected",
-                "message": f"Profile '{profile}' disconnected",
-            }
-        )
+        await self.broadcast_bytes(_disconnected_status(profile, f"Profile '{profile}' disconnected"))
 
         # Logout the profile
         authenticator.logout(profile)
 
-    def disconnect_all(self) -> None:
-        """Disconnect all profiles and clear connections."""
+    async def disconnect_all(self) -> None:
+        """Disconnect all profiles, clear connections and notify clients."""
+        profiles = list(self.connected_profiles)
         self.connected_profiles.clear()
         self.profile_connections.clear()
+        self.ws_to_profiles.clear()
+
+        # Each status is serialized once and shared by every recipient
+        for profile in profiles:
+            await self.broadcast_bytes(_disconnected_status(profile, f"Profile '{profile}' disconnected"))
+
+        # Clearing the session dict is cheap; doing it on the loop keeps it in step with is_authenticated()
         authenticator.logout_all()
 
 
@@ -261,8 +348,7 @@ manager = ConnectionManager()
 @app.get("/")
 async def get_index() -> FileResponse:
     """Serve the main application page."""
-    static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "static")
-    return FileResponse(os.path.join(static_dir, "index.html"))
+    return FileResponse(INDEX_PATH)
 
 
 @app.get("/api/profiles")
@@ -345,7 +431,7 @@ async def logout_profile(profile: str) -> dict:
 async def logout_all_profiles() -> dict:
     """Logout all profiles."""
     try:
-        manager.disconnect_all()
+        await manager.disconnect_all()
         return {"success": True, "message": "All profiles logged out"}
     except Exception as e:
         return {"success": False, "message": f"Logout all failed: {str(e)}"}
@@ -355,13 +441,13 @@ async def logout_all_profiles() -> dict:
 async def get_auth_status() -> dict:
     """Get authentication status for all profiles."""
     profile_names = config.get_profile_names()
-    status = {}
+    authenticated = authenticator.get_authenticated_set()
+    connected = manager.connected_profiles
 
-    for profile in profile_names:
-        status[profile] = {
-            "authenticated": authenticator.is_authenticated(profile),
-            "connected": profile in manager.connected_profiles,
-        }
+    status = {
+        profile: {"authenticated": profile in authenticated, "connected": profile in connected}
+        for profile in profile_names
+    }
 
     return {"profiles": status, "connected_count": len(manager.connected_profiles)}
 
@@ -548,8 +634,6 @@ async def test_stored_credentials() -> CredentialsTestResponse:
 async def test_new_credentials(request: CredentialsTestRequest) -> CredentialsTestResponse:
     """Test new credentials without saving them."""
     try:
-        from pydantic import SecretStr
-
         credentials = ADFSCredentials(
             username=request.username,
             password=SecretStr(request.password),
@@ -572,6 +656,131 @@ async def get_config_info() -> dict:
         raise HTTPException(status_code=500, detail=f"Error getting config info: {str(e)}") from e
 
 
+def _is_valid_ws_message(message: object) -> bool:
+    """Check the shape of an inbound WebSocket message once at the boundary.
+
+    Handlers build their models with ``model_construct`` and rely on this check
+    instead of running full pydantic validation for every message.
+    """
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        return False
+
+    profile = message.get("profile")
+    if profile is not None and not isinstance(profile, str):
+        return False
+
+    profiles = message.get("profiles")
+    if profiles is not None and not (isinstance(profiles, list) and all(isinstance(p, str) for p in profiles)):
+        return False
+
+    command = message.get("command")
+    if command is not None and not isinstance(command, str):
+        return False
+
+    # JSON clients often send whole numbers as floats (30.0); the executor works in whole seconds
+    timeout = message.get("timeout")
+    if timeout is not None and (
+        isinstance(timeout, bool)
+        or not isinstance(timeout, int | float)
+        or (isinstance(timeout, float) and not timeout.is_integer())
+    ):
+        return False
+
+    credentials = message.get("credentials")
+    return credentials is None or isinstance(credentials, dict)
+
+
+async def _handle_connect_profile(manager: ConnectionManager, websocket: WebSocket, message: dict) -> None:
+    """Handle a ``connect_profile`` WebSocket message."""
+    profile = message.get("profile")
+    credentials = message.get("credentials")
+    if profile:
+        await manager.connect_profile(profile, websocket, credentials)
+
+
+async def _handle_disconnect_profile(manager: ConnectionManager, websocket: WebSocket, message: dict) -> None:
+    """Handle a ``disconnect_profile`` WebSocket message."""
+    profile = message.get("profile")
+    if profile:
+        await manager.disconnect_profile(profile, websocket)
+
+
+async def _handle_execute_command(manager: ConnectionManager, websocket: WebSocket, message: dict) -> None:
+    """Handle an ``execute_command`` WebSocket message."""
+    command = message.get("command")
+    # The frontend sends a single ``profile``; other clients may send a ``profiles`` list
+    profiles = message.get("profiles") or ([message["profile"]] if message.get("profile") else [])
+
+    if not (command and profiles):
+        return
+
+    known_profiles = {profile.name: profile for profile in config.get_all_profiles()}
+    runnable: list[AWSProfile] = []
+    for profile in profiles:
+        if profile in manager.connected_profiles and profile in known_profiles:
+            runnable.append(known_profiles[profile])
+        else:
+            await manager.send_personal_bytes(_command_error(profile, f"Profile '{profile}' not connected"), websocket)
+
+    if not runnable:
+        return
+
+    # Timeout was already checked by _is_valid_ws_message
+    command_executor = CommandExecutor(timeout=int(message.get("timeout", executor.timeout)))
+    pending = {profile.name for profile in runnable}
+    try:
+        # Each result is queued on the connection's writer as soon as it is produced,
+        # so a slow client never holds up the remaining profiles
+        async for result in command_executor.execute_command(command, runnable, stop_on_error=False):
+            pending.discard(result.profile)
+            executor.add_to_history(CommandHistoryEntry.from_result(result))
+            await manager.send_personal_bytes(_command_result(result.profile, result), websocket)
+    except Exception as e:
+        for profile in pending:
+            await manager.send_personal_bytes(_command_error(profile, str(e)), websocket)
+
+
+async def _handle_validate_credentials(manager: ConnectionManager, websocket: WebSocket, message: dict) -> None:
+    """Handle a ``validate_credentials`` WebSocket message."""
+    try:
+        profiles = message.get("profiles", [])
+        if profiles:
+            # Validate specific profiles
+            profile_objects = [config.get_profile_by_name(p) for p in profiles if config.get_profile_by_name(p)]
+            results = await credentials_manager.validate_all_profiles(profile_objects)
+        else:
+            # Validate all profiles
+            all_profiles = []
+            for group_profiles in config.get_profiles().values():
+                all_profiles.extend(group_profiles)
+            results = await credentials_manager.validate_all_profiles(all_profiles)
+
+        await manager.send_personal_message(
+            {
+                "type": "credentials_validation_result",
+                "results": results,
+                "summary": credentials_manager.get_status_summary(),
+            },
+            websocket,
+        )
+    except Exception as e:
+        await manager.send_personal_message(
+            {"type": "credentials_validation_error", "error": str(e)},
+            websocket,
+        )
+
+
+WSHandler = Callable[[ConnectionManager, WebSocket, dict], Awaitable[None]]
+
+# WebSocket message dispatch table, keyed by message "type"
+_WS_HANDLERS: dict[str, WSHandler] = {
+    "connect_profile": _handle_connect_profile,
+    "disconnect_profile": _handle_disconnect_profile,
+    "execute_command": _handle_execute_command,
+    "validate_credentials": _handle_validate_credentials,
+}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """Enhanced WebSocket endpoint for real-time communication."""
@@ -579,99 +788,27 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
 
     try:
         while True:
-            # Receive message
-            data = await websocket.receive_text()
-            message = json.loads(data)
-
-            message_type = message.get("type")
-
-            if message_type == "connect_profile":
-                profile = message.get("profile")
-                credentials = message.get("credentials")
-                if profile:
-                    await manager.connect_profile(profile, websocket, credentials)
-
-            elif message_type == "disconnect_profile":
-                profile = message.get("profile")
-                if profile:
-                    await manager.disconnect_profile(profile, websocket)
-
-            elif message_type == "execute_command":
-                # Handle command execution
-                command = message.get("command")
-                profiles = message.get("profiles", [])
-
-                if command and profiles:
-                    # Create command request
-                    command_request = CommandRequest(
-                        command=command,
-                        profiles=profiles,
-                        timeout=message.get("timeout", 30),
-                    )
-
-                    # Execute command for all selected profiles
-                    for profile in profiles:
-                        if profile in manager.connected_profiles:
-                            try:
-                                result = await executor.execute_command(command_request)
-                                # Send result back to client
-                                await manager.send_personal_message(
-                                    {
-                                        "type": "command_result",
-                                        "profile": profile,
-                                        "result": result.model_dump(),
-                                    },
-                                    websocket,
-                                )
-                            except Exception as e:
-                                await manager.send_personal_message(
-                                    {
-                                        "type": "command_error",
-                                        "profile": profile,
-                                        "error": str(e),
-                                    },
-                                    websocket,
-                                )
-                        else:
-                            await manager.send_personal_message(
-                                {
-                                    "type": "command_error",
-                                    "profile": profile,
-                                    "error": f"Profile '{profile}' not connected",
-                                },
-                                websocket,
-                            )
+            # Receive message; clients may send text or binary frames and orjson parses both
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            data = frame.get("bytes") or frame.get("text")
+            if not data:
+                continue
+
+            message = orjson.loads(data)
+            if not _is_valid_ws_message(message):
+                await manager.send_personal_message({"type": "error", "error": "Invalid message"}, websocket)
+                continue
+
+            handler = _WS_HANDLERS.get(message["type"])
+            if handler is None:
+                await manager.send_personal_message(
+                    {"type": "error", "error": f"Unknown message type: {message['type']}"}, websocket
+                )
+                continue
 
-            elif message_type == "validate_credentials":
-                # Handle credential validation request
-                try:
-                    profiles = message.get("profiles", [])
-                    if profiles:
-                        # Validate specific profiles
-                        profile_objects = [
-                            config.get_profile_by_name(p) for p in profiles if config.get_profile_by_name(p)
-                        ]
-                        results = await credentials_manager.validate_all_profiles(profile_objects)
-                    else:
-                        # Validate all profiles
-                        all_profiles = []
-                        for group_profiles in config.get_profiles().values():
-                            all_profiles.extend(group_profiles)
-                        results = await credentials_manager.validate_all_profiles(all_profiles)
-
-                    await manager.send_personal_message(
-                        {
-                            "type": "credentials_validation_result",
-                            "results": results,
-                            "summary": credentials_manager.get_status_summary(),
-                        },
-                        websocket,
-                    )
-                except Exception as e:
-                    await manager.send_personal_message(
-                        {"type": "credentials_validation_error", "error": str(e)},
-                        websocket,
-                    )
+            await handler(manager, websocket, message)
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -680,31 +817,116 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
         manager.disconnect(websocket)
 
 
+def _export_json(export_request: ExportRequest, results: list[CommandResult]) -> Iterator[bytes]:
+    """Yield a JSON export one serialized result at a time."""
+    yield (
+        b'{"success":true,"data":{"format":'
+        + orjson.dumps(export_request.format)
+        + b',"include_timestamps":'
+        + orjson.dumps(export_request.include_timestamps)
+        + b',"results_count":'
+        + orjson.dumps(len(results))
+        + b',"results":['
+    )
+    for index, result in enumerate(results):
+        if index:
+            yield b","
+        yield result.__pydantic_serializer__.to_json(result)
+    yield b"]}}"
+
+
+# Number of CSV rows written to the buffer before it is flushed to the response
+_CSV_FLUSH_ROWS = 100
+
+
+def _export_csv(results: list[CommandResult]) -> Iterator[str]:
+    """Yield a CSV export in chunks of rows."""
+    yield "profile,status,output,error,duration\n"
+
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC quotes the text columns and leaves duration bare
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+    for index, result in enumerate(results, start=1):
+        writer.writerow((result.profile, result.status.value, result.output, result.error, result.duration))
+        if index % _CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _export_txt(results: list[CommandResult]) -> Iterator[str]:
+    """Yield a plain-text export one result at a time."""
+    for result in results:
+        yield f"=== {result.profile} ({result.status.value}, {result.duration:.2f}s) ===\n$ {result.command}\n"
+        if result.output:
+            yield result.output.rstrip("\n") + "\n"
+        if result.error:
+            yield result.error.rstrip("\n") + "\n"
+        yield "\n"
+
+
 @app.post("/api/export")
-async def export_results(export_request: ExportRequest, results: list[CommandResult]) -> dict:
+async def export_results(export_request: ExportRequest, results: list[CommandResult]) -> StreamingResponse:
     """Export command results in the specified format."""
-    try:
-        # This is a placeholder for export functionality
-        # In a real implementation, you would process the results
-        # and return the exported data in the requested format
-
-        exported_data = {
-            "timestamp": export_request.timestamp,
-            "format": export_request.format,
-            "include_metadata": export_request.include_metadata,
-            "results_count": len(results),
-            "results": [result.model_dump() for result in results],
-        }
+    # Stream the export so the full document never sits in memory
+    if export_request.format == "json":
+        return StreamingResponse(_export_json(export_request, results), media_type="application/json")
+    if export_request.format == "csv":
+        return StreamingResponse(_export_csv(results), media_type="text/csv")
+    if export_request.format == "txt":
+        return StreamingResponse(_export_txt(results), media_type="text/plain")
 
-        return {"success": True, "data": exported_data}
+    raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_request.format}")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}") from e
+
+def _io_uring_supported() -> bool:
+    """Check whether the running kernel supports the io_uring features granian relies on (Linux 5.11+)."""
+    if platform.system() != "Linux":
+        return False
+
+    try:
+        major, minor = (int(part) for part in platform.release().split(".")[:2])
+    except ValueError:
+        return False
+
+    return (major, minor) >= (5, 11)
 
 
 def run_app(host: str = "127.0.0.1", port: int = 8000, reload: bool = True) -> None:
-    """Run the FastAPI application."""
-    uvicorn.run("aws_adfs_gui.web_app:app", host=host, port=port, reload=reload)
+    """Run the FastAPI application.
+
+    Uses granian (installed via the ``granian`` extra) on io_uring-capable Linux
+    kernels, and falls back to uvicorn with uvloop and httptools.
+    """
+    if _io_uring_supported() and importlib.util.find_spec("granian") is not None:
+        from granian import Granian
+        from granian.constants import Interfaces, Loops
+
+        loop = Loops.rloop if importlib.util.find_spec("rloop") is not None else Loops.uvloop
+        Granian(
+            "aws_adfs_gui.web_app:app",
+            address=host,
+            port=port,
+            interface=Interfaces.ASGI,
+            loop=loop,
+            reload=reload,
+        ).serve()
+        return
+
+    # uvicorn[standard] ships uvloop (not on Windows), httptools and websockets; request them
+    # explicitly so a missing extra fails loudly instead of silently using the slower defaults
+    uvicorn.run(
+        "aws_adfs_gui.web_app:app",
+        host=host,
+        port=port,
+        reload=reload,
+        loop="uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio",
+        http="httptools",
+        ws="websockets",
+    )
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 class AWSADFSApp {
     constructor() {
         this.ws = null;
+        this.textDecoder = new TextDecoder();
         this.isConnected = false;
         this.connectionAttempts = 0;
         this.maxConnectionAttempts = 5;
@@ -36,6 +37,13 @@ class AWSADFSApp {
             'pd': true
         };
 
+        // Saved panel width, read from localStorage once at boot so resize events don't hit storage
+        this.savedPanelWidth = localStorage.getItem('leftPanelWidth');
+
+        // Pending localStorage writes keyed by storage key, flushed together when the browser is idle
+        this.pendingStorageWrites = new Map();
+        this.storageFlushScheduled = false;
+
         this.init();
     }
 
@@ -123,6 +131,11 @@ class AWSADFSApp {
             this.handleWindowResize();
         });
 
+        // Flush queued localStorage writes before the page goes away
+        window.addEventListener('pagehide', () => {
+            this.flushStorageWrites();
+        });
+
         // Click outside to close panel on mobile
         document.addEventListener('click', (e) => {
             this.handleClickOutside(e);
@@ -134,6 +147,8 @@ class AWSADFSApp {
         const wsUrl = `${protocol}//${window.location.host}/ws`;
 
         this.ws = new WebSocket(wsUrl);
+        // The server sends binary JSON frames; ArrayBuffers decode synchronously and keep message order
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('WebSocket connected');
@@ -144,7 +159,11 @@ class AWSADFSApp {
         };
 
         this.ws.onmessage = (event) => {
-            this.handleWebSocketMessage(JSON.parse(event.data));
+            // The server coalesces messages sent close together into a single array frame
+            const raw = typeof event.data === 'string' ? event.data : this.textDecoder.decode(event.data);
+            const data = JSON.parse(raw);
+            const messages = Array.isArray(data) ? data : [data];
+            messages.forEach(message => this.handleWebSocketMessage(message));
         };
 
         this.ws.onclose = (event) => {
@@ -266,12 +285,13 @@ class AWSADFSApp {
 
     handleCommandResult(message) {
         const { profile, result } = message;
-        if (result.success) {
+        const success = result.status === 'success';
+        if (success) {
             this.updateCommandOutput(profile, result.output, false);
         } else {
             this.updateCommandOutput(profile, result.error || 'Command failed', true);
         }
-        this.commandComplete(profile, result.success, result.duration);
+        this.commandComplete(profile, success, result.duration);
     }
 
     handleCommandError(message) {
@@ -488,7 +508,7 @@ class AWSADFSApp {
         }
 
         // Save collapse state to localStorage
-        localStorage.setItem('environmentCollapsed', JSON.stringify(this.environmentCollapsed));
+        this.queueStorageWrite('environmentCollapsed', this.environmentCollapsed);
     }
 
     loadEnvironmentCollapseState() {
@@ -1096,7 +1116,30 @@ class AWSADFSApp {
         }
 
         // Save to localStorage
-        localStorage.setItem('awsAdfsHistory', JSON.stringify(this.commandHistory));
+        this.queueStorageWrite('awsAdfsHistory', this.commandHistory);
+    }
+
+    queueStorageWrite(key, value) {
+        // Repeated writes to a key before the flush collapse into a single setItem
+        this.pendingStorageWrites.set(key, value);
+        if (this.storageFlushScheduled) {
+            return;
+        }
+
+        this.storageFlushScheduled = true;
+        if (window.requestIdleCallback) {
+            window.requestIdleCallback(() => this.flushStorageWrites(), { timeout: 1000 });
+        } else {
+            setTimeout(() => this.flushStorageWrites(), 0);
+        }
+    }
+
+    flushStorageWrites() {
+        this.storageFlushScheduled = false;
+        this.pendingStorageWrites.forEach((value, key) => {
+            localStorage.setItem(key, JSON.stringify(value));
+        });
+        this.pendingStorageWrites.clear();
     }
 
     loadHistory() {
@@ -1648,7 +1691,8 @@ class AWSADFSApp {
                 document.body.style.userSelect = '';
 
                 // Save panel width
-                localStorage.setItem('leftPanelWidth', leftPanel.style.width);
+                this.savedPanelWidth = leftPanel.style.width;
+                localStorage.setItem('leftPanelWidth', this.savedPanelWidth);
             }
         });
 
@@ -1656,6 +1700,7 @@ class AWSADFSApp {
         resizeHandle.addEventListener('dblclick', () => {
             leftPanel.style.width = '320px';
             leftPanel.style.flex = '0 0 320px';
+            this.savedPanelWidth = null;
             localStorage.removeItem('leftPanelWidth');
         });
     }
@@ -1671,7 +1716,7 @@ class AWSADFSApp {
         }
 
         const isHidden = localStorage.getItem('leftPanelHidden') === 'true';
-        const savedWidth = localStorage.getItem('leftPanelWidth');
+        const savedWidth = this.savedPanelWidth;
 
         if (savedWidth) {
             leftPanel.style.width = savedWidth;
@@ -1703,7 +1748,7 @@ class AWSADFSApp {
             leftPanel.classList.remove('mobile-show');
 
             // Restore desktop width if available
-            const savedWidth = localStorage.getItem('leftPanelWidth');
+            const savedWidth = this.savedPanelWidth;
             if (savedWidth) {
                 leftPanel.style.width = savedWidth;
                 leftPanel.style.flex = `0 0 ${savedWidth}`;
@@ -2037,6 +2082,7 @@ class AWSADFSApp {
         const welcomeModal = document.getElementById('welcome-modal');
         if (welcomeModal) {
             console.log('Welcome modal found, showing modal');
+            this.renderWelcomeContent(welcomeModal);
 
             // Get or create Bootstrap modal instance
             let modal = bootstrap.Modal.getInstance(welcomeModal);
@@ -2054,6 +2100,19 @@ class AWSADFSApp {
         }
     }
 
+    // Stamp the help content from its template on first open so it stays out of the initial render
+    renderWelcomeContent(welcomeModal) {
+        if (document.getElementById('welcome-content')) {
+            return;
+        }
+
+        const template = document.getElementById('welcome-tpl');
+        const header = welcomeModal.querySelector('.modal-header');
+        if (template && header) {
+            header.after(template.content.cloneNode(true));
+        }
+    }
+
                 closeWelcome() {
         console.log('closeWelcome called');
         const welcomeModal = document.getElementById('welcome-modal');
@@ -0,0 +1,64 @@
+"""Shared pytest fixtures and hooks."""
+
+import os
+
+import pytest
+
+# Drop modules whose subject cannot be imported at collection time instead of skipping each test
+collect_ignore: list[str] = []
+try:
+    import aws_adfs_gui.adfs_auth  # noqa: F401
+except ImportError:
+    collect_ignore.append("test_adfs_auth.py")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add ``--run-slow`` for the tests marked ``slow``."""
+    parser.addoption("--run-slow", action="store_true", default=False, help="run tests marked slow")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip ``slow`` tests unless ``--run-slow`` is given, keeping the local loop fast."""
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test, use --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config: pytest.Config) -> int | None:
+    """Keep ``-n auto`` serial when xdist workers would only add spawn overhead.
+
+    Returning 0 makes xdist fall back to ``--dist=no``: on single-core machines, and when
+    every positional argument is a node id (``path::Test::test``) selecting individual tests.
+    """
+    if os.environ.get("PYTEST_XDIST_AUTO_NUM_WORKERS"):
+        return None  # An explicit worker count always wins
+    # sched_getaffinity is Linux-only; macOS and Windows only report the total core count
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    if cpus <= 1:
+        return 0
+    if config.args and all("::" in arg for arg in config.args):
+        return 0
+    return None
+
+
+@pytest.fixture(scope="session")
+def adfs_authenticator_cls() -> type:
+    """Resolve ``ADFSAuthenticator`` once per session."""
+    from aws_adfs_gui.adfs_auth import ADFSAuthenticator
+
+    return ADFSAuthenticator
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one ``TestClient`` for the web app, shared by every test module.
+
+    The client is used without its context manager, so it keeps no lifespan or request state.
+    """
+    testclient = pytest.importorskip("fastapi.testclient")
+    web_app = pytest.importorskip("aws_adfs_gui.web_app")
+    return testclient.TestClient(web_app.app)
@@ -1,6 +1,8 @@
 """Tests for AWS credentials management and validation."""
 
+import asyncio
 import json
+import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
@@ -23,6 +25,19 @@ except ImportError:
     AWS_CREDENTIALS_AVAILABLE = False
 
 
+def _mock_process(stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0, exits: bool = True) -> Mock:
+    """Build a mock subprocess that exits with the given output, or never exits."""
+    mock_process = Mock()
+    if exits:
+        mock_process.returncode = returncode
+        mock_process.communicate = AsyncMock(return_value=(stdout, stderr))
+    else:
+        mock_process.returncode = None
+        mock_process.communicate = AsyncMock(side_effect=asyncio.Event().wait)
+    mock_process.wait = AsyncMock(return_value=returncode)
+    return mock_process
+
+
 class TestCredentialStatus:
     """Test cases for CredentialStatus constants and configuration."""
 
@@ -78,6 +93,8 @@ class TestAWSCredentialsManager:
             manager.aws_dir = Path(tmpdir) / ".aws"
             manager.credentials_file = manager.aws_dir / "credentials"
             manager.config_file = manager.aws_dir / "config"
+            # Exercise the AWS CLI path regardless of whether boto3 is installed
+            manager._use_boto3 = False
             yield manager
 
     @pytest.fixture
@@ -148,24 +165,56 @@ region = us-west-2
         exists = credentials_mgr._profile_exists_in_config("nonexistent-profile")
         assert exists is False
 
+    def test_profile_sections_cached_until_file_changes(self, credentials_mgr: "AWSCredentialsManager") -> None:
+        """Test that config files are re-parsed only when their contents change."""
+        credentials_mgr.aws_dir.mkdir(parents=True, exist_ok=True)
+        credentials_mgr.credentials_file.write_text("[first]\naws_access_key_id = AKIA...\n")
+
+        with patch.object(Path, "read_bytes", autospec=True, side_effect=Path.read_bytes) as mock_read:
+            assert credentials_mgr._profile_exists_in_config("first") is True
+            assert credentials_mgr._profile_exists_in_config("first") is True
+            assert mock_read.call_count == 1
+
+        # A rewrite changes size/mtime and invalidates the cached sections
+        credentials_mgr.credentials_file.write_text("[second-profile]\naws_access_key_id = AKIA...\n")
+        assert credentials_mgr._profile_exists_in_config("second-profile") is True
+        assert credentials_mgr._profile_exists_in_config("first") is False
+
+    def test_profile_sections_dropped_when_file_removed(self, credentials_mgr: "AWSCredentialsManager") -> None:
+        """Test that a deleted config file stops matching without an existence pre-check."""
+        credentials_mgr.aws_dir.mkdir(parents=True, exist_ok=True)
+        credentials_mgr.credentials_file.write_text("[gone]\n")
+        assert credentials_mgr._profile_exists_in_config("gone") is True
+
+        credentials_mgr.credentials_file.unlink()
+
+        with patch.object(Path, "exists", autospec=True) as mock_exists:
+            assert credentials_mgr._profile_exists_in_config("gone") is False
+        mock_exists.assert_not_called()
+
+    def test_profile_sections_ignore_non_headers(self, credentials_mgr: "AWSCredentialsManager") -> None:
+        """Test that only line-leading section headers are treated as profiles."""
+        credentials_mgr.aws_dir.mkdir(parents=True, exist_ok=True)
+        credentials_mgr.config_file.write_bytes(
+            b"[profile dev]\r\nregion = us-east-1\r\n# [commented]\r\nrole_arn = arn:aws:iam::1:role/[x]\r\n"
+        )
+
+        assert credentials_mgr._profile_exists_in_config("dev") is True
+        assert credentials_mgr._profile_exists_in_config("commented") is False
+        assert credentials_mgr._profile_exists_in_config("x") is False
+
     @pytest.mark.asyncio
     @patch("aws_adfs_gui.aws_credentials.asyncio.create_subprocess_exec")
     async def test_test_aws_credentials_success(
         self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
     ) -> None:
         """Test successful AWS credentials validation."""
-        # Mock successful process
-        mock_process = Mock()
-        mock_process.returncode = 0
-        mock_process.communicate = AsyncMock(
-            return_value=(
-                json.dumps(
-                    {"Account": "123456789012", "UserId": "test-user", "Arn": "arn:aws:sts::123456789012:user/test"}
-                ).encode(),
-                b"",
-            )
+        mock_subprocess.return_value = _mock_process(
+            stdout=json.dumps(
+                {"Account": "123456789012", "UserId": "test-user", "Arn": "arn:aws:sts::123456789012:user/test"},
+                indent=2,
+            ).encode()
         )
-        mock_subprocess.return_value = mock_process
 
         success, output, error = await credentials_mgr._test_aws_credentials("test-profile")
 
@@ -179,11 +228,9 @@ region = us-west-2
         self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
     ) -> None:
         """Test failed AWS credentials validation."""
-        # Mock failed process
-        mock_process = Mock()
-        mock_process.returncode = 1
-        mock_process.communicate = AsyncMock(return_value=(b"", b"An error occurred (ExpiredToken): Token has expired"))
-        mock_subprocess.return_value = mock_process
+        mock_subprocess.return_value = _mock_process(
+            stderr=b"An error occurred (ExpiredToken): Token has expired", returncode=1
+        )
 
         success, output, error = await credentials_mgr._test_aws_credentials("test-profile")
 
@@ -196,17 +243,112 @@ region = us-west-2
         self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
     ) -> None:
         """Test AWS credentials validation timeout."""
-        # Mock process that times out
-        mock_process = Mock()
-        mock_process.communicate = AsyncMock(side_effect=TimeoutError())
-        mock_process.kill = AsyncMock()
-        mock_process.wait = AsyncMock()
+        # Process that never exits
+        mock_process = _mock_process(exits=False)
+        mock_process.kill = Mock()
         mock_subprocess.return_value = mock_process
+        credentials_mgr._sts_timeout = 0.01
 
         success, output, error = await credentials_mgr._test_aws_credentials("test-profile")
 
         assert success is False
         assert "timed out" in error
+        mock_process.kill.assert_called_once()
+
+    @patch("aws_adfs_gui.aws_credentials.asyncio.create_subprocess_exec")
+    async def test_test_aws_credentials_read_error_kills_process(
+        self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
+    ) -> None:
+        """Test that the CLI process is killed and reaped when reading its output fails."""
+        mock_process = _mock_process(exits=False)
+        mock_process.communicate.side_effect = ValueError("Separator is found, but chunk is longer than limit")
+        mock_process.kill = Mock()
+        mock_subprocess.return_value = mock_process
+
+        success, output, error = await credentials_mgr._test_aws_credentials("test-profile")
+
+        assert success is False
+        assert "chunk is longer than limit" in error
+        mock_process.kill.assert_called_once()
+        mock_process.wait.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("aws_adfs_gui.aws_credentials.asyncio.create_subprocess_exec")
+    async def test_test_aws_credentials_cached_until_ttl_or_invalidate(
+        self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
+    ) -> None:
+        """Test that STS results are reused within the TTL and re-fetched after invalidation."""
+        mock_subprocess.side_effect = lambda *args, **kwargs: _mock_process(stdout=b'{"Account": "123456789012"}')
+
+        first = await credentials_mgr._test_aws_credentials("test-profile")
+        second = await credentials_mgr._test_aws_credentials("test-profile")
+        assert first == second
+        assert mock_subprocess.call_count == 1
+
+        credentials_mgr.invalidate("test-profile")
+        await credentials_mgr._test_aws_credentials("test-profile")
+        assert mock_subprocess.call_count == 2
+
+        # An expired entry is refreshed as well
+        credentials_mgr._sts_ttl = 0.0
+        await credentials_mgr._test_aws_credentials("test-profile")
+        assert mock_subprocess.call_count == 3
+
+    @pytest.mark.asyncio
+    @patch("aws_adfs_gui.aws_credentials.asyncio.create_subprocess_exec")
+    async def test_test_aws_credentials_boto3(
+        self, mock_subprocess: Mock, credentials_mgr: "AWSCredentialsManager"
+    ) -> None:
+        """Test that boto3, when available, replaces the AWS CLI subprocess and reuses sessions."""
+        mock_boto3 = Mock()
+        mock_botocore_config = Mock()
+        sts_client = mock_boto3.Session.return_value.client.return_value
+        sts_client.get_caller_identity.return_value = {
+            "UserId": "test-user",
+            "Account": "123456789012",
+            "Arn": "arn:aws:sts::123456789012:user/test",
+            "ResponseMetadata": {},
+        }
+        credentials_mgr._use_boto3 = True
+
+        with patch.dict(sys.modules, {"boto3": mock_boto3, "botocore.config": mock_botocore_config}):
+            success, output, error = await credentials_mgr._test_aws_credentials("test-profile")
+            credentials_mgr._sts_cache.clear()
+            await credentials_mgr._test_aws_credentials("test-profile")
+
+        assert success is True
+        assert json.loads(output)["Account"] == "123456789012"
+        assert error == ""
+        mock_boto3.Session.assert_called_once_with(profile_name="test-profile")
+        mock_subprocess.assert_not_called()
+
+        # Invalidation drops the session so rewritten credentials are picked up
+        credentials_mgr.invalidate("test-profile")
+        assert "test-profile" not in credentials_mgr._sessions
+
+    @pytest.mark.asyncio
+    async def test_test_aws_credentials_boto3_new_session_after_file_change(
+        self, credentials_mgr: "AWSCredentialsManager"
+    ) -> None:
+        """Test that a credentials file rewritten outside the GUI gets a fresh boto3 session."""
+        mock_boto3 = Mock()
+        mock_boto3.Session.return_value.client.return_value.get_caller_identity.return_value = {"Account": "1"}
+        credentials_mgr._use_boto3 = True
+        credentials_mgr.aws_dir.mkdir(parents=True)
+        credentials_mgr.credentials_file.write_text("[test-profile]\naws_access_key_id = OLD\n")
+
+        with patch.dict(sys.modules, {"boto3": mock_boto3, "botocore.config": Mock()}):
+            await credentials_mgr._test_aws_credentials("test-profile")
+            credentials_mgr._sts_cache.clear()
+            await credentials_mgr._test_aws_credentials("test-profile")
+            assert mock_boto3.Session.call_count == 1
+
+            # e.g. `aws-adfs login` run from a terminal
+            credentials_mgr.credentials_file.write_text("[test-profile]\naws_access_key_id = NEWER\n")
+            credentials_mgr._sts_cache.clear()
+            await credentials_mgr._test_aws_credentials("test-profile")
+
+        assert mock_boto3.Session.call_count == 2
 
     def test_parse_credentials_info(self, credentials_mgr: "AWSCredentialsManager") -> None:
         """Test parsing AWS STS output."""
@@ -235,6 +377,23 @@ region = us-west-2
         assert "last_validated" in info
         assert len(info) == 1
 
+    def test_parse_credentials_info_timestamp_per_second(self, credentials_mgr: "AWSCredentialsManager") -> None:
+        """Test that validations within the same second share one formatted timestamp."""
+        with patch(
+            "aws_adfs_gui.aws_credentials.time.time",
+            side_effect=[1_700_000_000.1, 1_700_000_000.9, 1_700_000_001.0, 1_700_000_000.5],
+        ):
+            first = credentials_mgr._parse_credentials_info("{}")["last_validated"]
+            second = credentials_mgr._parse_credentials_info("{}")["last_validated"]
+            third = credentials_mgr._parse_credentials_info("{}")["last_validated"]
+            # The previous second is still cached after moving on
+            fourth = credentials_mgr._parse_credentials_info("{}")["last_validated"]
+
+        assert first is second
+        assert fourth is first
+        assert first == "2023-11-14T22:13:20+00:00"
+        assert third == "2023-11-14T22:13:21+00:00"
+
     def test_create_status_result(self, credentials_mgr: "AWSCredentialsManager") -> None:
         """Test creation of status result dictionary."""
         status = CredentialStatus.VALID
@@ -260,6 +419,54 @@ region = us-west-2
         assert result["status"] == CredentialStatus.MISSING
         assert "not found" in result["message"]
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("concurrency", "expected_peak"), [(1, 1), (2, 2), (8, 5)])
+    async def test_validate_all_profiles_bounded_concurrency(
+        self, credentials_mgr: "AWSCredentialsManager", concurrency: int, expected_peak: int
+    ) -> None:
+        """Test that profile validations overlap but never exceed the concurrency cap."""
+        running = 0
+        peak = 0
+
+        async def fake_validate(profile_name: str) -> dict:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"status": CredentialStatus.VALID, "profile": profile_name}
+
+        profiles = [AWSProfile(name=f"profile-{i}", group=ProfileGroup.DEV) for i in range(5)]
+        with patch.object(credentials_mgr, "_validate_profile_credentials", side_effect=fake_validate):
+            results = await credentials_mgr.validate_all_profiles(profiles, concurrency=concurrency)
+
+        assert peak == expected_peak
+        assert set(results) == {profile.name for profile in profiles}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("error", "expected_status"),
+        [
+            ("An error occurred (ExpiredToken) when calling GetCallerIdentity", CredentialStatus.EXPIRED),
+            ("TokenRefreshRequired", CredentialStatus.EXPIRED),
+            ("An error occurred (AccessDenied) when calling GetCallerIdentity", CredentialStatus.INVALID),
+            ("AccessDenied after ExpiredToken", CredentialStatus.EXPIRED),
+            ("Unable to locate credentials", CredentialStatus.INVALID),
+        ],
+        ids=["expired", "refresh_required", "access_denied", "expired_wins", "other"],
+    )
+    async def test_validate_profile_credentials_error_classification(
+        self, credentials_mgr: "AWSCredentialsManager", error: str, expected_status: str
+    ) -> None:
+        """Test that STS errors map to credential statuses."""
+        with (
+            patch.object(credentials_mgr, "_profile_exists_in_config", return_value=True),
+            patch.object(credentials_mgr, "_test_aws_credentials", AsyncMock(return_value=(False, "", error))),
+        ):
+            result = await credentials_mgr._validate_profile_credentials("test-profile")
+
+        assert result["status"] == expected_status
+
     def test_get_profile_status(self, credentials_mgr: "AWSCredentialsManager") -> None:
         """Test getting profile status."""
         # Test unknown profile
@@ -368,6 +575,45 @@ class TestFlexibleCommandBuilder:
         assert "--recursive" in cmd
         assert "--human-readable" in cmd
 
+    def test_repeated_builds_return_independent_lists(self, cmd_builder: "FlexibleCommandBuilder") -> None:
+        """Test that cached commands are handed out as fresh lists."""
+        first = cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com", custom_args=["--verbose"])
+        first.append("--mutated")
+
+        second = cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com", custom_args=["--verbose"])
+
+        assert "--mutated" not in second
+        assert second[-1] == "--verbose"
+
+    def test_build_with_unhashable_options(self, cmd_builder: "FlexibleCommandBuilder") -> None:
+        """Test that unhashable option values bypass the cache instead of failing."""
+        cmd = cmd_builder.build_aws_cli_command("s3 ls", "test-profile", extra_args=["--recursive"], tags={"a": 1})
+
+        assert "--recursive" in cmd
+
+    @pytest.mark.parametrize(
+        ("first", "second", "expected"),
+        [(3600, 3600.0, "--duration=3600.0"), (1, True, "--duration=True")],
+        ids=["int_then_float", "int_then_bool"],
+    )
+    def test_equal_values_of_other_types_are_not_shared(
+        self, cmd_builder: "FlexibleCommandBuilder", first: object, second: object, expected: str
+    ) -> None:
+        """Test that option values which compare equal but render differently get their own argv."""
+        cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com", duration=first)
+
+        cmd = cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com", duration=second)
+
+        assert expected in cmd
+
+    def test_changed_defaults_are_honoured(self, cmd_builder: "FlexibleCommandBuilder") -> None:
+        """Test that cached builds still reflect the builder's current defaults."""
+        assert "--env" in cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com")
+
+        cmd_builder.default_aws_adfs_options["env_mode"] = False
+
+        assert "--env" not in cmd_builder.build_aws_adfs_command("test-profile", "adfs.example.com")
+
 
 @pytest.mark.skipif(not AWS_CREDENTIALS_AVAILABLE, reason="AWS credentials module not available")
 class TestGlobalInstances:
@@ -1,17 +1,16 @@
 """Tests for the command executor module."""
 
-import sys
 import time
+from collections import deque
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
 
-# Add src to path for imports
-sys.path.insert(0, "src")
-
 # Test availability of command executor
 try:
-    from aws_adfs_gui.command_executor import CommandExecutor
+    from aws_adfs_gui.command_executor import CommandExecutor, CommandHistoryEntry
+    from aws_adfs_gui.models import AWSProfile, CommandResult, ExecutionStatus, ProfileGroup
 
     COMMAND_EXECUTOR_AVAILABLE = True
 except ImportError:
@@ -29,7 +28,8 @@ class TestCommandExecutorBasic:
         assert hasattr(executor, "command_history")
         assert hasattr(executor, "max_history")
         assert executor.max_history == 100
-        assert isinstance(executor.command_history, list)
+        assert isinstance(executor.command_history, deque)
+        assert executor.command_history.maxlen == 100
         assert len(executor.command_history) == 0
 
     @pytest.mark.skipif(not COMMAND_EXECUTOR_AVAILABLE, reason="CommandExecutor not available")
@@ -49,8 +49,8 @@ class TestCommandExecutorBasic:
 
         # Add some mock history items
         executor.command_history = [
-            Mock(id="1", command="aws s3 ls"),
-            Mock(id="2", command="aws ec2 describe-instances"),
+            SimpleNamespace(id="1", command="aws s3 ls"),
+            SimpleNamespace(id="2", command="aws ec2 describe-instances"),
         ]
 
         assert len(executor.command_history) == 2
@@ -62,17 +62,10 @@ class TestCommandExecutorBasic:
     @pytest.mark.skipif(not COMMAND_EXECUTOR_AVAILABLE, reason="CommandExecutor not available")
     def test_max_history_limit(self) -> None:
         """Test that history is limited to max_history items."""
-        executor = CommandExecutor()
-        executor.max_history = 3  # Set small limit for testing
+        executor = CommandExecutor(max_history=3)  # Small limit for testing
 
-        # Mock _add_to_history behavior by directly manipulating the list
-        mock_history_items = [Mock(id=f"cmd_{i}") for i in range(5)]
-
-        # Simulate adding items one by one with the max limit logic
-        for item in mock_history_items:
-            executor.command_history.append(item)
-            if len(executor.command_history) > executor.max_history:
-                executor.command_history.pop(0)
+        for item in [SimpleNamespace(id=f"cmd_{i}") for i in range(5)]:
+            executor.add_to_history(item)
 
         # Should only have the last 3 items
         assert len(executor.command_history) == 3
@@ -89,13 +82,11 @@ class TestCommandExecutorHistory:
         """Test adding items to command history."""
         executor = CommandExecutor()
 
-        # Create a mock history entry
-        mock_entry = Mock()
-        mock_entry.id = "test-id"
-        mock_entry.command = "aws s3 ls"
+        # Create a stand-in history entry
+        mock_entry = SimpleNamespace(id="test-id", command="aws s3 ls")
 
         # Use the private method directly
-        executor._add_to_history(mock_entry)
+        executor.add_to_history(mock_entry)
 
         assert len(executor.command_history) == 1
         assert executor.command_history[0] == mock_entry
@@ -106,17 +97,35 @@ class TestCommandExecutorHistory:
         executor = CommandExecutor()
 
         # Add some mock history
-        mock_entry = Mock(id="test")
+        mock_entry = SimpleNamespace(id="test")
         executor.command_history.append(mock_entry)
 
         history = executor.get_command_history()
 
         # Modifying the returned list shouldn't affect the original
-        history.append(Mock(id="new"))
+        history.append(SimpleNamespace(id="new"))
 
         assert len(executor.command_history) == 1
         assert len(history) == 2
 
+    @pytest.mark.skipif(not COMMAND_EXECUTOR_AVAILABLE, reason="CommandExecutor not available")
+    def test_history_entry_from_result(self) -> None:
+        """Test that history entries are compact, immutable records of a result."""
+        result = CommandResult(
+            profile="test-profile", command="aws s3 ls", status=ExecutionStatus.SUCCESS, output="ok", duration=1.5
+        )
+
+        entry = CommandHistoryEntry.from_result(result)
+
+        assert entry.profile == "test-profile"
+        assert entry.command == "aws s3 ls"
+        assert entry.success is True
+        assert entry.duration == 1.5
+        assert entry.id
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.success = False  # type: ignore[misc]
+
 
 class TestCommandExecutorLogic:
     """Test command executor logic without external dependencies."""
@@ -145,6 +154,28 @@ class TestCommandExecutorLogic:
         assert "kds-ets-np" in other_profiles
         assert "kds-gps-pd" in other_profiles
 
+    @pytest.mark.skipif(not COMMAND_EXECUTOR_AVAILABLE, reason="CommandExecutor not available")
+    async def test_execute_command_keeps_selection_order(self) -> None:
+        """Test that profiles run, and are skipped after an error, in the order they were selected."""
+        profiles = [
+            AWSProfile(name="kds-ets-np", group=ProfileGroup.NON_PRODUCTION),
+            AWSProfile(name="aws-dev-eu", group=ProfileGroup.DEV),
+            AWSProfile(name="kds-gps-pd", group=ProfileGroup.PRODUCTION),
+        ]
+
+        async def fake_execute(profile, params):
+            status = ExecutionStatus.ERROR if profile.name == "aws-dev-eu" else ExecutionStatus.SUCCESS
+            return CommandResult(profile=profile.name, command=params["command"], status=status, duration=0.0)
+
+        with patch.object(CommandExecutor, "_execute_single_command", side_effect=fake_execute):
+            results = [result async for result in CommandExecutor().execute_command("aws s3 ls", profiles)]
+
+        assert [(r.profile, r.status) for r in results] == [
+            ("kds-ets-np", ExecutionStatus.SUCCESS),
+            ("aws-dev-eu", ExecutionStatus.ERROR),
+            ("kds-gps-pd", ExecutionStatus.SKIPPED),
+        ]
+
     def test_command_timing_simulation(self) -> None:
         """Test command timing simulation."""
         start_time = time.time()
@@ -162,12 +193,11 @@ class TestCommandExecutorLogic:
 class TestCommandExecutorWithMocks:
     """Test command executor with mocked dependencies."""
 
-    @patch("aws_adfs_gui.command_executor.config")
+    @patch("aws_adfs_gui.config.config")
     def test_execute_command_with_mock_config(self, mock_config) -> None:
         """Test command execution with mocked config."""
         # Mock the config to return test profiles
-        mock_profile = Mock()
-        mock_profile.group.value = "dev"
+        mock_profile = SimpleNamespace(group=SimpleNamespace(value="dev"))
         mock_config.get_profile_by_name.return_value = mock_profile
 
         # We can test the setup without actually executing commands
@@ -180,7 +210,7 @@ class TestCommandExecutorWithMocks:
 
     @pytest.mark.skip(reason="Async tests not supported in current environment")
     @patch("aws_adfs_gui.command_executor.asyncio")
-    @patch("aws_adfs_gui.command_executor.config")
+    @patch("aws_adfs_gui.config.config")
     async def test_execute_single_command_mock(self, mock_config, mock_asyncio) -> None:
         """Test single command execution with mocks."""
         # Mock asyncio subprocess
@@ -293,14 +323,14 @@ class TestCommandExecutorIntegration:
 
         # Simulate adding multiple commands to history
         mock_commands = [
-            Mock(id="1", command="aws s3 ls"),
-            Mock(id="2", command="aws ec2 describe-instances"),
-            Mock(id="3", command="aws iam list-users"),
+            SimpleNamespace(id="1", command="aws s3 ls"),
+            SimpleNamespace(id="2", command="aws ec2 describe-instances"),
+            SimpleNamespace(id="3", command="aws iam list-users"),
         ]
 
         # Add commands one by one
         for cmd in mock_commands:
-            executor._add_to_history(cmd)
+            executor.add_to_history(cmd)
 
         # Verify they're all there
         history = executor.get_command_history()
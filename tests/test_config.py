@@ -2,51 +2,42 @@
 
 import json
 import os
-import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-# Add src to path for imports
-sys.path.insert(0, "src")
+models_module = pytest.importorskip("aws_adfs_gui.models")
+AWSProfile = models_module.AWSProfile
+ProfileGroup = models_module.ProfileGroup
 
-# Test dependencies
-try:
-    from aws_adfs_gui.config import Config
+config_module = pytest.importorskip("aws_adfs_gui.config")
+ConfigManager = config_module.ConfigManager
 
-    CONFIG_AVAILABLE = True
-except ImportError:
-    CONFIG_AVAILABLE = False
-    Config = None
+# The legacy Config API these tests were written against is optional
+Config = getattr(config_module, "Config", None)
+CONFIG_AVAILABLE = Config is not None
 
-# Test model availability
-try:
-    from aws_adfs_gui.models import ProfileGroup  # noqa: F401
 
-    PROFILE_GROUP_AVAILABLE = True
-except ImportError:
-    PROFILE_GROUP_AVAILABLE = False
+@pytest.fixture
+def temp_config_file(tmp_path):
+    """Provide an existing config file path inside pytest's tmp_path."""
+    config_path = tmp_path / "config.json"
+    config_path.touch()
+    return str(config_path)
 
 
-@pytest.fixture
-def temp_config_file():
-    """Create a temporary config file for testing."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as tf:
-        config_path = tf.name
-    try:
-        yield config_path
-    finally:
-        if os.path.exists(config_path):
-            os.remove(config_path)
+@pytest.fixture(scope="session")
+def readonly_config(tmp_path_factory):
+    """Provide one Config shared by tests that only read from it."""
+    return Config(config_file=str(tmp_path_factory.mktemp("cfg") / "c.json"))
 
 
 @pytest.fixture
-def temp_config_dir():
-    """Create a temporary directory for config testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
+def temp_config_dir(tmp_path):
+    """Provide a config directory path inside pytest's tmp_path."""
+    return str(tmp_path)
 
 
 @pytest.mark.skipif(not CONFIG_AVAILABLE, reason="Config not available due to dependencies")
@@ -60,7 +51,6 @@ class TestConfigInitialization:
 
     def test_config_initialization_with_default_file(self) -> None:
         """Test Config initialization with default config file."""
-        import tempfile
 
         # Create a real temporary directory for the test
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -74,11 +64,11 @@ class TestConfigInitialization:
 
     def test_config_directory_creation(self, temp_config_dir) -> None:
         """Test that config directory is created if it doesn't exist."""
-        config_path = os.path.join(temp_config_dir, "subdir", "config.json")
-        config = Config(config_file=config_path)
+        config_path = Path(temp_config_dir) / "subdir" / "config.json"
+        config = Config(config_file=str(config_path))
 
         # Directory should be created
-        assert os.path.exists(os.path.dirname(config_path))
+        assert config_path.parent.is_dir()
         # Config object should be created successfully
         assert config is not None
 
@@ -124,8 +114,7 @@ class TestConfigFileOperations:
         # Should load the test configuration
         profiles = config.get_profiles()
         assert "dev" in profiles
-        if PROFILE_GROUP_AVAILABLE:
-            assert ProfileGroup.DEV in profiles
+        assert ProfileGroup.DEV in profiles
 
     def test_load_config_invalid_json(self, temp_config_file) -> None:
         """Test loading config from file with invalid JSON."""
@@ -157,9 +146,9 @@ class TestConfigFileOperations:
 class TestProfileManagement:
     """Test cases for profile management operations."""
 
-    def test_get_profile_names(self, temp_config_file) -> None:
+    def test_get_profile_names(self, readonly_config) -> None:
         """Test getting all profile names."""
-        config = Config(config_file=temp_config_file)
+        config = readonly_config
         names = config.get_profile_names()
 
         assert isinstance(names, list)
@@ -170,35 +159,33 @@ class TestProfileManagement:
         for profile in expected_profiles:
             assert profile in names
 
-    def test_get_profiles(self, temp_config_file) -> None:
+    def test_get_profiles(self, readonly_config) -> None:
         """Test getting all profiles organized by groups."""
-        config = Config(config_file=temp_config_file)
+        config = readonly_config
         profiles = config.get_profiles()
 
         assert isinstance(profiles, dict)
         assert len(profiles) > 0
 
         # Should have the expected groups
-        if PROFILE_GROUP_AVAILABLE:
-            assert ProfileGroup.DEV in profiles
-            assert ProfileGroup.NON_PRODUCTION in profiles
-            assert ProfileGroup.PRODUCTION in profiles
+        assert ProfileGroup.DEV in profiles
+        assert ProfileGroup.NON_PRODUCTION in profiles
+        assert ProfileGroup.PRODUCTION in profiles
 
-    def test_get_profile_by_name_existing(self, temp_config_file) -> None:
+    def test_get_profile_by_name_existing(self, readonly_config) -> None:
         """Test getting an existing profile by name."""
-        config = Config(config_file=temp_config_file)
+        config = readonly_config
 
         # Test with a known default profile
         profile = config.get_profile_by_name("aws-dev-eu")
 
         assert profile is not None
         assert profile.name == "aws-dev-eu"
-        if PROFILE_GROUP_AVAILABLE:
-            assert profile.group == ProfileGroup.DEV
+        assert profile.group == ProfileGroup.DEV
 
-    def test_get_profile_by_name_nonexistent(self, temp_config_file) -> None:
+    def test_get_profile_by_name_nonexistent(self, readonly_config) -> None:
         """Test getting a non-existent profile by name."""
-        config = Config(config_file=temp_config_file)
+        config = readonly_config
 
         profile = config.get_profile_by_name("nonexistent-profile")
 
@@ -208,9 +195,6 @@ class TestProfileManagement:
         """Test adding a new profile."""
         config = Config(config_file=temp_config_file)
 
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         from aws_adfs_gui.models import AWSProfile
 
         # ProfileGroup imported at module level
@@ -240,9 +224,6 @@ class TestProfileManagement:
         """Test removing an existing profile."""
         config = Config(config_file=temp_config_file)
 
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         from aws_adfs_gui.models import AWSProfile
 
         # ProfileGroup imported at module level
@@ -278,12 +259,9 @@ class TestProfileManagement:
 class TestDefaultProfiles:
     """Test cases for default profile configuration."""
 
-    def test_default_profiles_structure(self, temp_config_file) -> None:
+    def test_default_profiles_structure(self, readonly_config) -> None:
         """Test that default profiles have the expected structure."""
-        config = Config(config_file=temp_config_file)
-
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
+        config = readonly_config
 
         from aws_adfs_gui.models import ProfileGroup
 
@@ -313,9 +291,9 @@ class TestDefaultProfiles:
         assert "kds-gps-pd" in pd_names
         assert "kds-iss-pd" in pd_names
 
-    def test_default_profile_regions(self, temp_config_file) -> None:
+    def test_default_profile_regions(self, readonly_config) -> None:
         """Test that default profiles have correct regions."""
-        config = Config(config_file=temp_config_file)
+        config = readonly_config
 
         # Test specific profiles and their expected regions
         aws_dev_eu = config.get_profile_by_name("aws-dev-eu")
@@ -338,9 +316,6 @@ class TestConfigPersistence:
 
     def test_config_persistence_after_add(self, temp_config_file) -> None:
         """Test that config changes persist after adding a profile."""
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         from aws_adfs_gui.models import AWSProfile
 
         # ProfileGroup imported at module level
@@ -360,9 +335,6 @@ class TestConfigPersistence:
 
     def test_config_persistence_after_remove(self, temp_config_file) -> None:
         """Test that config changes persist after removing a profile."""
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         from aws_adfs_gui.models import AWSProfile
         # ProfileGroup imported at module level
 
@@ -385,30 +357,174 @@ class TestConfigWithoutDependencies:
 
     def test_config_file_path_handling(self, temp_config_dir) -> None:
         """Test config file path handling without requiring full imports."""
-        config_path = os.path.join(temp_config_dir, "test_config.json")
+        config_path = Path(temp_config_dir) / "test_config.json"
 
         try:
             from aws_adfs_gui.config import Config
 
-            config = Config(config_file=config_path)
+            config = Config(config_file=str(config_path))
             # If we can create the config, test basic file operations
             assert hasattr(config, "config_file")
-            assert str(config.config_file) == config_path
+            assert config.config_file == config_path
         except ImportError:
             # If imports fail, we can still test path handling logic
-            from pathlib import Path
-
-            test_path = Path(config_path)
-            assert test_path.parent.exists() or not test_path.exists()
+            assert config_path.parent.is_dir()
 
     def test_config_directory_exists(self, temp_config_dir) -> None:
         """Test that we can work with config directories."""
-        config_path = os.path.join(temp_config_dir, "nested", "config.json")
+        config_path = Path(temp_config_dir) / "nested" / "config.json"
 
         # Test directory creation logic
-        config_dir = os.path.dirname(config_path)
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir, exist_ok=True)
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+
+        assert config_path.parent.is_dir()
+
+
+class TestConfigManagerSerialization:
+    """Test that the config file stays interoperable with the stdlib json module."""
+
+    def test_saved_config_readable_by_json(self, temp_config_dir) -> None:
+        """Test that a saved config can be read back with json.load."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        manager.load_config()  # Writes the defaults
 
-        assert os.path.exists(config_dir)
-        assert os.path.isdir(config_dir)
+        with open(manager.config_file, encoding="utf-8") as f:
+            data = json.load(f)
+
+        assert data["profiles"]["dev"][0]["name"] == "aws-dev-eu"
+        assert data["timeout"] == 30
+
+    def test_json_written_config_loads(self, temp_config_dir) -> None:
+        """Test that a config written with json.dump loads correctly."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        with open(manager.config_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"profiles": {"pd": [{"name": "prod", "group": "pd", "region": "eu-west-1"}]}, "timeout": 60},
+                f,
+                indent=2,
+            )
+
+        loaded = manager.load_config()
+
+        assert [profile.name for profile in manager.get_all_profiles()] == ["prod"]
+        assert loaded.timeout == 60
+
+    def test_default_config_matches_saved_config(self, temp_config_dir) -> None:
+        """Test that the pre-serialized defaults match what save_config writes."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        defaults = manager.load_config()  # Writes the pre-serialized defaults
+        default_bytes = manager.config_file.read_bytes()
+
+        manager.save_config(defaults)
+
+        assert manager.config_file.read_bytes() == default_bytes
+
+
+class TestConfigManagerProfiles:
+    """Test ConfigManager profile lookup and editing."""
+
+    def test_get_profile_by_name(self, temp_config_dir) -> None:
+        """Test looking up default and missing profiles by name."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+
+        profile = manager.get_profile_by_name("aws-dev-eu")
+
+        assert profile is not None
+        assert profile.region == "eu-west-1"
+        assert manager.get_profile_by_name("nonexistent-profile") is None
+
+    def test_lookups_share_one_read_of_the_file(self, temp_config_dir) -> None:
+        """Test that grouped, name and set lookups are all served from one parse of the file."""
+        ConfigManager(config_dir=Path(temp_config_dir)).load_config()  # Write defaults
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+
+        with patch.object(manager, "load_config", wraps=manager.load_config) as load_config:
+            profile = manager.get_profile_by_name("kds-ets-np")
+            manager.get_profiles()
+            manager.get_profile_names()
+            manager.get_profile_names_set()
+
+        load_config.assert_called_once()
+        assert profile is not None
+        assert profile.group == ProfileGroup.NON_PRODUCTION
+        assert manager.get_profile_by_name("kds-ets-np") is profile
+        assert profile in manager.get_profiles_by_group(ProfileGroup.NON_PRODUCTION)
+
+    def test_external_edit_is_picked_up(self, temp_config_dir) -> None:
+        """Test that a config file changed behind the manager's back is re-read."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        assert "aws-dev-eu" in manager.get_profile_names_set()
+
+        manager.config_file.write_bytes(json.dumps({"profiles": {"pd": [{"name": "edited", "group": "pd"}]}}).encode())
+
+        assert manager.get_profile_names() == ["edited"]
+        assert manager.get_profile_names_set() == {"edited"}
+        assert manager.get_profile_by_name("aws-dev-eu") is None
+        assert [p.name for p in manager.get_profiles_by_group(ProfileGroup.PRODUCTION)] == ["edited"]
+
+    def test_get_profiles_cached_until_save(self, temp_config_dir) -> None:
+        """Test that the grouped profiles are reused until the config is saved."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        profiles = manager.get_profiles()
+
+        with patch.object(manager, "load_config", wraps=manager.load_config) as load_config:
+            assert manager.get_profiles() == profiles
+            load_config.assert_not_called()
+
+        manager.add_profile(AWSProfile(name="test-cached-profile", group=ProfileGroup.PRODUCTION))
+
+        assert manager.get_profiles() != profiles
+        assert "test-cached-profile" in [p.name for p in manager.get_profiles_by_group(ProfileGroup.PRODUCTION)]
+
+    def test_get_profiles_results_do_not_share_cache(self, temp_config_dir) -> None:
+        """Test that modifying returned profile lists leaves the cached profiles intact."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+
+        manager.get_profiles()[ProfileGroup.DEV].clear()
+        manager.get_profiles().pop(ProfileGroup.PRODUCTION)
+        manager.get_profiles_by_group(ProfileGroup.NON_PRODUCTION).sort(key=lambda p: p.name, reverse=True)
+
+        profiles = manager.get_profiles()
+        assert len(profiles[ProfileGroup.DEV]) == 2
+        assert ProfileGroup.PRODUCTION in profiles
+        assert [p.name for p in profiles[ProfileGroup.NON_PRODUCTION]] == ["kds-ets-np", "kds-gps-np", "kds-iss-np"]
+
+    @pytest.mark.parametrize(
+        "profiles",
+        [
+            {"dev": [{"name": "x", "group": "bogus"}]},
+            {"bogus": [{"name": "x", "group": "dev"}]},
+            {"dev": [{"group": "dev"}]},
+            {"dev": [{"name": "x", "group": "dev", "region": 123}]},
+            {"dev": [{"name": "x", "group": "dev", "description": ["not", "a", "string"]}]},
+        ],
+        ids=["bad_profile_group", "bad_group_key", "missing_name", "bad_region", "bad_description"],
+    )
+    def test_invalid_profile_entries_fall_back_to_defaults(self, temp_config_dir, profiles) -> None:
+        """Test that a file with an invalid profile entry is replaced by the defaults."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        manager.config_file.write_bytes(json.dumps({"profiles": profiles}).encode())
+
+        assert manager.get_profile_by_name("x") is None
+        assert sorted(manager.get_profile_names()) == sorted(p.name for p in manager.get_all_profiles())
+        assert len(manager.get_profile_names()) == 8
+
+    def test_add_and_remove_profile(self, temp_config_dir) -> None:
+        """Test that adding and removing profiles keeps the name index in sync."""
+        manager = ConfigManager(config_dir=Path(temp_config_dir))
+        manager.get_profile_names()  # Build the index before editing
+
+        manager.add_profile(AWSProfile(name="test-new-profile", group=ProfileGroup.DEV))
+
+        assert manager.get_profile_by_name("test-new-profile") is not None
+        assert "test-new-profile" in manager.get_profile_names()
+        assert "test-new-profile" in manager.get_profile_names_set()
+
+        assert manager.remove_profile("test-new-profile") is True
+        assert manager.get_profile_by_name("test-new-profile") is None
+        assert manager.remove_profile("test-new-profile") is False
+
+        # Changes are persisted
+        reloaded = ConfigManager(config_dir=Path(temp_config_dir))
+        assert reloaded.get_profile_by_name("test-new-profile") is None
+        assert len(reloaded.get_profiles()[ProfileGroup.DEV]) == 2
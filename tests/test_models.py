@@ -1,40 +1,19 @@
 """Tests for the models module - focusing on components available without pydantic."""
 
-import sys
-
 import pytest
 
-# Add src to path for imports
-sys.path.insert(0, "src")
-
-# Test imports individually to handle import errors gracefully
-try:
-    from aws_adfs_gui.models import ProfileGroup
-
-    PROFILE_GROUP_AVAILABLE = True
-except ImportError:
-    PROFILE_GROUP_AVAILABLE = False
-
-# Test more complex models
-try:
-    from aws_adfs_gui.models import AWSProfile  # noqa: F401
-
-    AWS_PROFILE_AVAILABLE = True
-except ImportError:
-    AWS_PROFILE_AVAILABLE = False
+ProfileGroup = pytest.importorskip("aws_adfs_gui.models").ProfileGroup
 
 
 class TestProfileGroup:
     """Test cases for ProfileGroup enum."""
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_values(self) -> None:
         """Test that ProfileGroup enum has correct values."""
         assert ProfileGroup.DEV == "dev"
         assert ProfileGroup.NON_PRODUCTION == "np"
         assert ProfileGroup.PRODUCTION == "pd"
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_membership(self) -> None:
         """Test ProfileGroup enum membership."""
         assert "dev" in ProfileGroup
@@ -42,7 +21,6 @@ class TestProfileGroup:
         assert "pd" in ProfileGroup
         assert "invalid" not in ProfileGroup
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_list(self) -> None:
         """Test getting all ProfileGroup values."""
         groups = list(ProfileGroup)
@@ -51,20 +29,18 @@ class TestProfileGroup:
         assert ProfileGroup.NON_PRODUCTION in groups
         assert ProfileGroup.PRODUCTION in groups
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_string_representation(self) -> None:
         """Test ProfileGroup string representation."""
-        assert str(ProfileGroup.DEV) == "ProfileGroup.DEV"
+        # StrEnum members stringify to their value
+        assert str(ProfileGroup.DEV) == "dev"
         assert repr(ProfileGroup.DEV) == "<ProfileGroup.DEV: 'dev'>"
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_value_access(self) -> None:
         """Test accessing ProfileGroup values."""
         assert ProfileGroup.DEV.value == "dev"
         assert ProfileGroup.NON_PRODUCTION.value == "np"
         assert ProfileGroup.PRODUCTION.value == "pd"
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_comparison(self) -> None:
         """Test ProfileGroup equality comparison."""
         assert ProfileGroup.DEV == ProfileGroup.DEV
@@ -73,7 +49,6 @@ class TestProfileGroup:
         # Test that enum members can be compared with their string values (this enum allows it)
         assert ProfileGroup.DEV == "dev"  # This enum supports string equality
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_iteration(self) -> None:
         """Test iterating over ProfileGroup values."""
         groups = []
@@ -89,16 +64,14 @@ class TestProfileGroup:
 class TestModelsImport:
     """Test cases for models import behavior."""
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_models_import_basic(self) -> None:
         """Test basic import of models module."""
-        # Import should work since we're only running if PROFILE_GROUP_AVAILABLE
+        # Import should work since the module imported at collection time
         import aws_adfs_gui.models
 
         assert hasattr(aws_adfs_gui.models, "ProfileGroup")
         print("✅ Basic models import successful")
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_profile_group_import(self) -> None:
         """Test importing ProfileGroup specifically."""
         from aws_adfs_gui.models import ProfileGroup
@@ -109,7 +82,6 @@ class TestModelsImport:
         assert hasattr(ProfileGroup, "PRODUCTION")
         print("✅ ProfileGroup import successful")
 
-    @pytest.mark.skipif(not PROFILE_GROUP_AVAILABLE, reason="ProfileGroup not available")
     def test_enum_functionality(self) -> None:
         """Test that ProfileGroup works as an enum."""
         from enum import Enum
@@ -127,7 +99,6 @@ class TestModelsImport:
 
 
 # Tests that require pydantic - will be skipped if not available
-@pytest.mark.skipif(not AWS_PROFILE_AVAILABLE, reason="Pydantic models not available")
 class TestPydanticModels:
     """Test cases for Pydantic models - only run if available."""
 
@@ -160,9 +131,6 @@ class TestManualModelLogic:
 
     def test_profile_group_logic(self) -> None:
         """Test logical operations with ProfileGroup."""
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         # Test that we can use ProfileGroup in logical operations
         dev_group = ProfileGroup.DEV
         prod_group = ProfileGroup.PRODUCTION
@@ -177,9 +145,6 @@ class TestManualModelLogic:
 
     def test_profile_group_categorization(self) -> None:
         """Test categorizing profiles by group."""
-        if not PROFILE_GROUP_AVAILABLE:
-            pytest.skip("ProfileGroup not available")
-
         # Test categorization logic
         dev_profiles = [ProfileGroup.DEV]
         production_profiles = [ProfileGroup.PRODUCTION]
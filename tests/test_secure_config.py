@@ -1,11 +1,42 @@
 """Tests for the secure configuration module."""
 
-import tempfile
+import mmap
+import os
+import stat
+from pathlib import Path
 
 import pytest
-from aws_adfs_gui.models import ADFSCredentials, ConnectionSettings
+from aws_adfs_gui.models import ADFSCredentials, AWSProfile, ProfileGroup
 from aws_adfs_gui.secure_config import SecureConfig, SecureConfigManager, SecureCredentials
-from pydantic import SecretStr
+from pydantic import SecretStr, ValidationError
+
+# Shared by the credential tests; none of them mutate it. Validation is covered by
+# test_secure_credentials_creation, so skip it here.
+_TEST_CREDS = SecureCredentials.model_construct(
+    username="test.user@company.com",
+    password=SecretStr("test-password-123"),
+    domain="COMPANY",
+    adfs_url="https://adfs.company.com",
+    certificate_path=None,
+)
+
+
+@pytest.fixture
+def creds():
+    """Provide the shared test credentials."""
+    return _TEST_CREDS
+
+
+def _assert_ciphertext_ok(path: Path, plaintext: bytes) -> None:
+    """Assert that an encrypted file is non-empty and never contains the plaintext.
+
+    The file is searched through a read-only mmap rather than read into memory.
+    """
+    with open(path, "rb") as f:
+        # mmap rejects empty files, so check the size first
+        assert os.fstat(f.fileno()).st_size > 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert mm.find(plaintext) == -1
 
 
 class TestSecureCredentials:
@@ -13,19 +44,48 @@ class TestSecureCredentials:
 
     def test_secure_credentials_creation(self):
         """Test creating secure credentials."""
-        creds = SecureCredentials(username="test.user@company.com", adfs_host="adfs.company.com")
+        creds = SecureCredentials(
+            username="test.user@company.com",
+            password="test-password-123",
+            domain="COMPANY",
+            adfs_url="https://adfs.company.com",
+        )
         assert creds.username == "test.user@company.com"
-        assert creds.adfs_host == "adfs.company.com"
+        assert creds.password.get_secret_value() == "test-password-123"
+        assert creds.adfs_url == "https://adfs.company.com"
         assert creds.certificate_path is None
 
+        with pytest.raises(ValidationError):
+            SecureCredentials(username="test.user@company.com", password="test-password-123")
+
     def test_secure_credentials_with_certificate(self):
         """Test creating secure credentials with certificate path."""
         creds = SecureCredentials(
-            username="test.user@company.com", adfs_host="adfs.company.com", certificate_path="/path/to/cert.pem"
+            username="test.user@company.com",
+            password="test-password-123",
+            domain="COMPANY",
+            adfs_url="https://adfs.company.com",
+            certificate_path="/path/to/cert.pem",
         )
         assert creds.certificate_path == "/path/to/cert.pem"
 
 
+class TestADFSCredentials:
+    """Test ADFS credentials model validation."""
+
+    def test_credentials_validation(self):
+        """Test that ADFS credentials are validated on construction."""
+        creds = ADFSCredentials(
+            username="test.user@company.com", password="test-password-123", adfs_host="adfs.company.com"
+        )
+        assert isinstance(creds.password, SecretStr)
+        assert creds.password.get_secret_value() == "test-password-123"
+        assert creds.certificate_path is None
+
+        with pytest.raises(ValidationError):
+            ADFSCredentials(username="test.user@company.com", password="test-password-123")
+
+
 class TestSecureConfig:
     """Test secure configuration model."""
 
@@ -33,150 +93,144 @@ class TestSecureConfig:
         """Test secure config with default values."""
         config = SecureConfig()
         assert config.credentials is None
-        assert config.connection_settings.timeout == 30
-        assert config.connection_settings.retries == 3
-        assert config.ui_settings == {}
-        assert config.version == "1.0"
+        assert config.profiles == {}
+        assert config.default_command == "aws s3 ls"
+        assert config.timeout == 30
+        assert config.max_history == 100
+        assert config.default_region == "us-east-1"
 
     def test_secure_config_with_values(self):
         """Test secure config with provided values."""
-        settings = ConnectionSettings(timeout=60, retries=5)
-        config = SecureConfig(connection_settings=settings, ui_settings={"theme": "dark"}, version="2.0")
-        assert config.connection_settings.timeout == 60
-        assert config.connection_settings.retries == 5
-        assert config.ui_settings["theme"] == "dark"
-        assert config.version == "2.0"
+        config = SecureConfig(timeout=60, max_history=50, default_region="eu-west-1")
+        assert config.timeout == 60
+        assert config.max_history == 50
+        assert config.default_region == "eu-west-1"
+
+        with pytest.raises(ValidationError):
+            SecureConfig(timeout=0)
+
+
+@pytest.fixture(scope="class")
+def shared_config_manager(tmp_path_factory):
+    """Create one config manager, with its key file, for tests that only read from it."""
+    return SecureConfigManager(config_dir=tmp_path_factory.mktemp("secure-config"))
 
 
+# Keep the tests that write to secure config directories together on one xdist worker
+@pytest.mark.xdist_group("secure-config")
 class TestSecureConfigManager:
     """Test secure configuration manager."""
 
     @pytest.fixture
-    def temp_config_dir(self):
+    def temp_config_dir(self, tmp_path):
         """Create a temporary configuration directory."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield tmpdir
+        return tmp_path
 
     @pytest.fixture
     def config_manager(self, temp_config_dir):
         """Create a config manager with temporary directory."""
         return SecureConfigManager(config_dir=temp_config_dir)
 
-    def test_config_manager_initialization(self, config_manager):
+    def test_config_manager_initialization(self, shared_config_manager):
         """Test config manager initialization."""
+        config_manager = shared_config_manager
         assert config_manager.config_dir.exists()
-        assert config_manager.config_file.exists()
         assert config_manager.key_file.exists()
 
-    def test_save_and_load_credentials(self, config_manager):
-        """Test saving and loading credentials."""
-        credentials = ADFSCredentials(
-            username="test.user@company.com", password=SecretStr("test-password-123"), adfs_host="adfs.company.com"
-        )
+        # The config file is written with the defaults on first load
+        config_manager.load_config()
+        assert config_manager.config_file.exists()
 
+    @pytest.mark.slow
+    def test_save_and_load_credentials(self, config_manager, creds):
+        """Test saving and loading credentials."""
         # Save credentials
-        success = config_manager.save_credentials(credentials)
-        assert success is True
+        config_manager.save_credentials(creds)
 
         # Load credentials
         loaded_creds = config_manager.load_credentials()
         assert loaded_creds is not None
         assert loaded_creds.username == "test.user@company.com"
         assert loaded_creds.password.get_secret_value() == "test-password-123"
-        assert loaded_creds.adfs_host == "adfs.company.com"
+        assert loaded_creds.domain == "COMPANY"
+        assert loaded_creds.adfs_url == "https://adfs.company.com"
 
-    def test_delete_credentials(self, config_manager):
+    @pytest.mark.slow
+    def test_delete_credentials(self, config_manager, creds):
         """Test deleting credentials."""
-        credentials = ADFSCredentials(
-            username="test.user@company.com", password=SecretStr("test-password-123"), adfs_host="adfs.company.com"
-        )
-
         # Save credentials
-        config_manager.save_credentials(credentials)
+        config_manager.save_credentials(creds)
         assert config_manager.has_credentials() is True
 
         # Delete credentials
-        success = config_manager.delete_credentials()
-        assert success is True
+        config_manager.clear_credentials()
         assert config_manager.has_credentials() is False
+        assert config_manager.load_credentials() is None
 
     def test_connection_settings(self, config_manager):
         """Test saving and loading connection settings."""
-        settings = ConnectionSettings(timeout=60, retries=5, no_sspi=False, env_mode=False)
+        config = config_manager.load_config()
+        config.timeout = 60
+        config.max_history = 50
+        config.default_command = "aws sts get-caller-identity"
 
         # Save settings
-        success = config_manager.save_connection_settings(settings)
-        assert success is True
+        config_manager.save_config(config)
 
         # Load settings
-        loaded_settings = config_manager.get_connection_settings()
-        assert loaded_settings.timeout == 60
-        assert loaded_settings.retries == 5
-        assert loaded_settings.no_sspi is False
-        assert loaded_settings.env_mode is False
+        loaded = config_manager.load_config()
+        assert loaded.timeout == 60
+        assert loaded.max_history == 50
+        assert loaded.default_command == "aws sts get-caller-identity"
 
-    def test_ui_settings(self, config_manager):
-        """Test saving and loading UI settings."""
-        ui_settings = {"theme": "dark", "export_format": "csv", "include_timestamps": False}
+    def test_profile_settings(self, config_manager):
+        """Test saving and loading profile settings."""
+        profiles = {ProfileGroup.DEV: [AWSProfile(name="test-dev", group=ProfileGroup.DEV, region="eu-west-1")]}
 
         # Save settings
-        success = config_manager.save_ui_settings(ui_settings)
-        assert success is True
+        config_manager.update_profiles(profiles)
 
         # Load settings
-        loaded_settings = config_manager.get_ui_settings()
-        assert loaded_settings["theme"] == "dark"
-        assert loaded_settings["export_format"] == "csv"
-        assert loaded_settings["include_timestamps"] is False
+        assert [profile.name for profile in config_manager.get_all_profiles()] == ["test-dev"]
+        assert config_manager.get_profiles_by_group(ProfileGroup.DEV)[0].region == "eu-west-1"
+        assert config_manager.get_profiles_by_group(ProfileGroup.PRODUCTION) == []
 
-    def test_config_info(self, config_manager):
+    def test_config_info(self, shared_config_manager):
         """Test getting configuration information."""
-        info = config_manager.get_config_info()
-        assert "config_dir" in info
-        assert "has_credentials" in info
-        assert "credentials_valid" in info
-        assert "version" in info
-        assert "profile_count" in info
-
-    def test_credentials_encryption(self, config_manager):
-        """Test that credentials are properly encrypted."""
-        credentials = ADFSCredentials(
-            username="test.user@company.com", password=SecretStr("test-password-123"), adfs_host="adfs.company.com"
-        )
+        info = shared_config_manager.get_config_summary()
+        assert info["total_profiles"] == 8
+        assert info["profile_groups"] == [group.value for group in ProfileGroup]
+        assert info["has_credentials"] is False
+        assert info["timeout"] == 30
+        assert info["max_history"] == 100
 
-        # Save credentials
-        config_manager.save_credentials(credentials)
 
-        # Check that password file contains encrypted data
-        assert config_manager.password_file.exists()
+@pytest.fixture(scope="class")
+def saved_manager(tmp_path_factory):
+    """Create a config manager that has saved the test credentials once."""
+    manager = SecureConfigManager(config_dir=tmp_path_factory.mktemp("secure-config-saved"))
+    manager.save_credentials(_TEST_CREDS)
+    return manager
 
-        # Raw file content should not contain the plain password
-        with open(config_manager.password_file, "rb") as f:
-            encrypted_content = f.read()
 
-        assert b"test-password-123" not in encrypted_content
-        assert len(encrypted_content) > 0
+@pytest.mark.slow
+@pytest.mark.xdist_group("secure-config")
+class TestSecureConfigManagerEncryption:
+    """Test the on-disk security properties of saved credentials."""
 
-    def test_config_file_permissions(self, config_manager):
-        """Test that config files have proper permissions."""
-        credentials = ADFSCredentials(
-            username="test.user@company.com", password=SecretStr("test-password-123"), adfs_host="adfs.company.com"
-        )
-
-        # Save credentials
-        config_manager.save_credentials(credentials)
-
-        # Check file permissions (should be 600)
-        import stat
-
-        config_stat = config_manager.config_file.stat()
-        config_mode = stat.filemode(config_stat.st_mode)
-        assert config_mode == "-rw-------"
+    def test_credentials_encryption(self, saved_manager):
+        """Test that credentials are properly encrypted."""
+        # Credentials are stored encrypted inside the config file
+        assert saved_manager.config_file.exists()
 
-        key_stat = config_manager.key_file.stat()
-        key_mode = stat.filemode(key_stat.st_mode)
-        assert key_mode == "-rw-------"
+        # Raw file content should not contain the plain password or username
+        _assert_ciphertext_ok(saved_manager.config_file, b"test-password-123")
+        _assert_ciphertext_ok(saved_manager.config_file, b"test.user@company.com")
 
-        password_stat = config_manager.password_file.stat()
-        password_mode = stat.filemode(password_stat.st_mode)
-        assert password_mode == "-rw-------"
+    def test_config_file_permissions(self, saved_manager):
+        """Test that config files have proper permissions."""
+        # Owner read/write only (600)
+        expected = stat.S_IRUSR | stat.S_IWUSR
+        for path in (saved_manager.config_file, saved_manager.key_file):
+            mode = stat.S_IMODE(path.stat().st_mode)
+            assert mode == expected, f"{path} has mode {mode:o}"
@@ -1,14 +1,13 @@
 """Tests for the web application."""
 
-import os
-import sys
-import tempfile
+import asyncio
+import csv
+import io
+import json
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
-# Add src to path for imports
-sys.path.insert(0, "src")
-
 # Try to import core modules
 try:
     from aws_adfs_gui.config import Config
@@ -21,41 +20,46 @@ except ImportError:
     AWSProfile = None
     ProfileGroup = None
 
-# Import FastAPI and TestClient after ensuring they're available
+# Import the web app after ensuring FastAPI is available
 try:
-    from aws_adfs_gui.web_app import app
-    from fastapi.testclient import TestClient
+    from aws_adfs_gui.models import CommandResult, ExecutionStatus
+    from aws_adfs_gui.web_app import (
+        _SEND_MAX_BATCH,
+        _SEND_QUEUE_SIZE,
+        ConnectionManager,
+        _command_error,
+        _command_result,
+        _connection_status,
+        _disconnected_status,
+        _io_uring_supported,
+        _is_valid_ws_message,
+        run_app,
+    )
 
     FASTAPI_AVAILABLE = True
 except ImportError:
     FASTAPI_AVAILABLE = False
-    app = None
-    TestClient = None
+    ConnectionManager = None
+    _command_error = None
+    _command_result = None
+    _connection_status = None
+    run_app = None
+    _disconnected_status = None
+    _io_uring_supported = None
+    _is_valid_ws_message = None
 
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    if not FASTAPI_AVAILABLE:
-        pytest.skip("FastAPI not available")
-    return TestClient(app)
-
-
-@pytest.fixture
-def temp_config():
+def temp_config(tmp_path):
     """Create a temporary config file for isolated config tests."""
     if not CONFIG_AVAILABLE:
         pytest.skip("Config not available")
 
-    with tempfile.NamedTemporaryFile(delete=False) as tf:
-        config_path = tf.name
-    try:
-        yield Config(config_file=config_path)
-    finally:
-        if os.path.exists(config_path):
-            os.remove(config_path)
+    return Config(config_file=str(tmp_path / "cfg.json"))
 
 
+# Tests that change app-level profile and history state share one xdist worker
+@pytest.mark.xdist_group("web-app")
 @pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
 class TestWebApp:
     """Test cases for the web application."""
@@ -112,6 +116,81 @@ class TestWebApp:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_logout_all_profiles(self, client):
+        """Test logging out all profiles."""
+        response = client.post("/api/auth/logout-all")
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "message": "All profiles logged out"}
+
+    def test_build_aws_adfs_command(self, client):
+        """Test building an aws-adfs command, including repeated option sets."""
+        params = {"profile_name": "dev", "adfs_host": "adfs.example.com"}
+        options = {"region": "us-west-2", "custom_args": ["--no-session-cache"]}
+        first = client.post("/api/commands/build-aws-adfs", params=params, json=options)
+        second = client.post("/api/commands/build-aws-adfs", params=params, json=options)
+        assert first.json() == second.json()
+        command = first.json()["command"]
+        assert command[:2] == ["aws-adfs", "login"]
+        assert "--region=us-west-2" in command
+        assert command[-1] == "--no-session-cache"
+
+    def test_export_results(self, client):
+        """Test exporting command results as a streamed JSON document."""
+        results = [
+            {"profile": "dev", "command": "aws s3 ls", "status": "success", "output": "ok", "duration": 0.5},
+            {"profile": "prod", "command": "aws s3 ls", "status": "error", "error": "denied", "duration": 0.2},
+        ]
+        response = client.post("/api/export", json={"export_request": {"format": "json"}, "results": results})
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["format"] == "json"
+        assert data["results_count"] == 2
+        assert [result["profile"] for result in data["results"]] == ["dev", "prod"]
+
+    def test_export_results_csv(self, client):
+        """Test exporting command results as CSV with quoted fields."""
+        results = [
+            {"profile": "dev", "command": "aws s3 ls", "status": "success", "output": 'a "b", c', "duration": 0.5},
+        ]
+        response = client.post("/api/export", json={"export_request": {"format": "csv"}, "results": results})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.text.splitlines() == [
+            "profile,status,output,error,duration",
+            '"dev","success","a ""b"", c","",0.5',
+        ]
+
+    def test_export_results_csv_many_rows(self, client):
+        """Test that large CSV exports round-trip through a CSV parser."""
+        results = [
+            {"profile": f"p{i}", "command": "aws s3 ls", "status": "success", "output": "a\nb", "duration": i}
+            for i in range(150)
+        ]
+        response = client.post("/api/export", json={"export_request": {"format": "csv"}, "results": results})
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert len(rows) == 151
+        assert rows[-1] == ["p149", "success", "a\nb", "", "149.0"]
+
+    def test_export_results_txt(self, client):
+        """Test exporting command results as plain text."""
+        results = [{"profile": "dev", "command": "aws s3 ls", "status": "success", "output": "bucket", "duration": 1}]
+        response = client.post("/api/export", json={"export_request": {"format": "txt"}, "results": results})
+        assert response.status_code == 200
+        assert "$ aws s3 ls\nbucket\n" in response.text
+
+    def test_export_results_unknown_format(self, client):
+        """Test that unsupported export formats are rejected."""
+        response = client.post("/api/export", json={"export_request": {"format": "xml"}, "results": []})
+        assert response.status_code == 400
+
+    def test_cors_preflight_methods(self, client):
+        """Test that CORS preflight only allows the methods the API uses."""
+        headers = {"Origin": "http://example.com", "Access-Control-Request-Method": "DELETE"}
+        assert client.options("/api/profiles/dev", headers=headers).status_code == 200
+
+        headers["Access-Control-Request-Method"] = "PATCH"
+        assert client.options("/api/profiles/dev", headers=headers).status_code == 400
+
     def test_clear_command_history(self, client):
         """Test clearing command history."""
         response = client.delete("/api/history")
@@ -119,6 +198,7 @@ class TestWebApp:
         assert response.json()["message"] == "Command history cleared"
 
 
+@pytest.mark.xdist_group("web-app")
 @pytest.mark.skipif(not CONFIG_AVAILABLE, reason="Config not available")
 class TestConfig:
     """Test cases for configuration management."""
@@ -167,3 +247,324 @@ class TestConfig:
         # Verify it was removed
         profile = temp_config.get_profile_by_name("test-profile")
         assert profile is None
+
+
+@pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
+class TestWebSocketMessageValidation:
+    """Test cases for the WebSocket message boundary check."""
+
+    def test_valid_messages(self):
+        """Test that well-formed messages are accepted."""
+        assert _is_valid_ws_message({"type": "connect_profile", "profile": "aws-dev-eu", "credentials": {}})
+        assert _is_valid_ws_message({"type": "execute_command", "command": "aws s3 ls", "profiles": ["a", "b"]})
+        assert _is_valid_ws_message({"type": "validate_credentials"})
+        assert _is_valid_ws_message({"type": "execute_command", "timeout": 30})
+        assert _is_valid_ws_message({"type": "execute_command", "timeout": 30.0})
+
+    def test_invalid_messages(self):
+        """Test that malformed messages are rejected."""
+        assert not _is_valid_ws_message(["not", "a", "dict"])
+        assert not _is_valid_ws_message({"profile": "missing-type"})
+        assert not _is_valid_ws_message({"type": "connect_profile", "profile": 123})
+        assert not _is_valid_ws_message({"type": "execute_command", "profiles": "aws-dev-eu"})
+        assert not _is_valid_ws_message({"type": "execute_command", "timeout": "30"})
+        assert not _is_valid_ws_message({"type": "execute_command", "timeout": 30.5})
+        assert not _is_valid_ws_message({"type": "execute_command", "timeout": True})
+        assert not _is_valid_ws_message({"type": "connect_profile", "credentials": "secret"})
+
+
+@pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
+class TestMessageTemplates:
+    """Test cases for the pre-serialized outbound message templates."""
+
+    def test_disconnected_status_template(self):
+        """Test that the pre-built disconnected frame is valid JSON with escaped fields."""
+        payload = json.loads(_disconnected_status('odd"profile', "line one\nline two"))
+
+        assert payload == {
+            "type": "connection_status",
+            "profile": 'odd"profile',
+            "status": "disconnected",
+            "message": "line one\nline two",
+        }
+
+    def test_connection_status_payload(self):
+        """Test that connection_status payloads only carry a message when one is given."""
+        assert json.loads(_connection_status("aws-dev-eu", "connecting")) == {
+            "type": "connection_status",
+            "profile": "aws-dev-eu",
+            "status": "connecting",
+        }
+        assert json.loads(_connection_status("aws-dev-eu", "connected", "ok"))["message"] == "ok"
+
+    def test_command_result_template(self):
+        """Test that the command_result frame embeds the serialized result."""
+        result = CommandResult(
+            profile="aws-dev-eu", command="aws s3 ls", status=ExecutionStatus.SUCCESS, output="ok", duration=0.5
+        )
+        payload = json.loads(_command_result("aws-dev-eu", result))
+
+        assert payload["type"] == "command_result"
+        assert payload["profile"] == "aws-dev-eu"
+        assert payload["result"] == json.loads(result.model_dump_json())
+
+    def test_command_error_template(self):
+        """Test that the command_error frame escapes the error text."""
+        assert json.loads(_command_error("aws-dev-eu", 'bad "quote"')) == {
+            "type": "command_error",
+            "profile": "aws-dev-eu",
+            "error": 'bad "quote"',
+        }
+
+
+@pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
+class TestWebSocket:
+    """Test cases for the WebSocket endpoint."""
+
+    def test_disconnect_profile_message(self, client):
+        """Test that a disconnect_profile message is dispatched and answered."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "disconnect_profile", "profile": "aws-dev-eu"})
+            frame = websocket.receive_json(mode="binary")
+
+        assert isinstance(frame, list)
+        data = frame[0]
+        assert data["type"] == "connection_status"
+        assert data["profile"] == "aws-dev-eu"
+        assert data["status"] == "disconnected"
+
+    def test_execute_command_streams_results(self, client):
+        """Test that execute_command runs on connected profiles and reports the rest as errors."""
+
+        async def fake_execute(self, command, profiles, stop_on_error=True):
+            for profile in profiles:
+                yield CommandResult(
+                    profile=profile.name, command=command, status=ExecutionStatus.SUCCESS, output="ok", duration=0.1
+                )
+
+        with (
+            patch("aws_adfs_gui.web_app.manager.connected_profiles", {"aws-dev-eu"}),
+            patch("aws_adfs_gui.web_app.CommandExecutor.execute_command", fake_execute),
+            client.websocket_connect("/ws") as websocket,
+        ):
+            websocket.send_json(
+                {"type": "execute_command", "command": "aws s3 ls", "profiles": ["aws-dev-eu", "aws-dev-sg"]}
+            )
+            frame = websocket.receive_json(mode="binary")
+
+        assert [message["type"] for message in frame] == ["command_error", "command_result"]
+        assert frame[0]["profile"] == "aws-dev-sg"
+        assert frame[1]["result"]["output"] == "ok"
+
+    def test_unknown_message_type(self, client):
+        """Test that unknown message types get an error reply."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "not_a_real_type"})
+            frame = websocket.receive_json(mode="binary")
+
+        assert frame == [{"type": "error", "error": "Unknown message type: not_a_real_type"}]
+
+    def test_invalid_message_gets_error_reply(self, client):
+        """Test that messages failing the boundary check get an error reply instead of silence."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "execute_command", "command": "aws s3 ls", "profiles": "aws-dev-eu"})
+            frame = websocket.receive_json(mode="binary")
+
+        assert frame == [{"type": "error", "error": "Invalid message"}]
+
+    def test_binary_client_frames_are_accepted(self, client):
+        """Test that messages sent as binary frames are parsed like text frames."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_bytes(json.dumps({"type": "disconnect_profile", "profile": "aws-dev-eu"}).encode())
+            frame = websocket.receive_json(mode="binary")
+
+        assert frame[0]["status"] == "disconnected"
+
+    def test_messages_sent_together_share_a_frame(self, client):
+        """Test that messages queued within the flush window are coalesced into one frame."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "connect_profile", "profile": "nonexistent-profile"})
+            frame = websocket.receive_json(mode="binary")
+
+        assert [message["status"] for message in frame] == ["connecting", "disconnected"]
+
+    def test_connect_unknown_profile(self, client):
+        """Test that connecting a profile missing from the configuration is rejected."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "connect_profile", "profile": "nonexistent-profile"})
+            frame = websocket.receive_json(mode="binary")
+
+        assert frame[-1]["message"] == "Profile 'nonexistent-profile' not found in configuration"
+
+
+@pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
+class TestServerSelection:
+    """Test cases for choosing the production server."""
+
+    @pytest.mark.parametrize(
+        ("system", "release", "expected"),
+        [
+            ("Linux", "6.8.0-45-generic", True),
+            ("Linux", "5.11.0", True),
+            ("Linux", "5.10.102", False),
+            ("Linux", "unknown", False),
+            ("Darwin", "23.4.0", False),
+        ],
+    )
+    def test_io_uring_supported(self, system, release, expected):
+        """Test io_uring detection from the platform kernel release."""
+        with (
+            patch("aws_adfs_gui.web_app.platform.system", return_value=system),
+            patch("aws_adfs_gui.web_app.platform.release", return_value=release),
+        ):
+            assert _io_uring_supported() is expected
+
+    def test_uvicorn_fallback_uses_fast_protocols(self):
+        """Test that the uvicorn fallback requests httptools and websockets."""
+        with (
+            patch("aws_adfs_gui.web_app._io_uring_supported", return_value=False),
+            patch("aws_adfs_gui.web_app.uvicorn.run") as run,
+        ):
+            run_app(reload=False)
+
+        kwargs = run.call_args.kwargs
+        assert kwargs["http"] == "httptools"
+        assert kwargs["ws"] == "websockets"
+        assert kwargs["loop"] in ("uvloop", "asyncio")
+
+
+@pytest.mark.skipif(not FASTAPI_AVAILABLE, reason="FastAPI not available")
+class TestConnectionManager:
+    """Test cases for the WebSocket connection manager."""
+
+    async def test_broadcast_prunes_dead_connections(self):
+        """Test that connections failing during broadcast are removed after the loop."""
+        manager = ConnectionManager()
+        healthy = AsyncMock()
+        dead = AsyncMock()
+        dead.send_bytes.side_effect = RuntimeError("connection closed")
+        manager.active_connections.update({healthy, dead})
+
+        await manager.broadcast({"type": "ping"})
+
+        healthy.send_bytes.assert_awaited_once_with(b'{"type":"ping"}')
+        assert manager.active_connections == {healthy}
+
+    async def test_broadcast_is_not_blocked_by_slow_connection(self):
+        """Test that broadcast sends to every connection concurrently."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+
+        async def wait_for_release(text):
+            await release.wait()
+
+        async def release_slow(text):
+            release.set()
+
+        slow = AsyncMock()
+        slow.send_bytes.side_effect = wait_for_release
+        fast = AsyncMock()
+        fast.send_bytes.side_effect = release_slow
+        manager.active_connections.update({slow, fast})
+
+        await asyncio.wait_for(manager.broadcast({"type": "ping"}), timeout=1)
+
+        fast.send_bytes.assert_awaited_once()
+        assert manager.active_connections == {slow, fast}
+
+    async def test_writer_caps_frame_size(self):
+        """Test that a backlog of queued messages is split into bounded frames."""
+        manager = ConnectionManager()
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        for index in range(40):
+            await manager.send_personal_message({"index": index}, websocket)
+        await asyncio.sleep(0.05)
+        manager.disconnect(websocket)
+
+        frames = [json.loads(call.args[0]) for call in websocket.send_bytes.await_args_list]
+        assert [len(frame) for frame in frames] == [32, 8]
+
+    async def test_disconnect_all_notifies_clients(self):
+        """Test that bulk disconnect sends one shared status payload per profile."""
+        manager = ConnectionManager()
+        websocket = AsyncMock()
+        manager.active_connections.add(websocket)
+        manager.connected_profiles.update({"aws-dev-eu", "aws-dev-sg"})
+
+        with patch("aws_adfs_gui.web_app.authenticator.logout_all"):
+            await manager.disconnect_all()
+
+        statuses = [json.loads(call.args[0]) for call in websocket.send_bytes.await_args_list]
+        assert {status["profile"] for status in statuses} == {"aws-dev-eu", "aws-dev-sg"}
+        assert {status["status"] for status in statuses} == {"disconnected"}
+        assert not manager.connected_profiles
+
+    async def test_broadcast_drops_client_with_full_queue(self):
+        """Test that a client whose send queue is full is disconnected instead of buffered without bound."""
+        manager = ConnectionManager()
+        never = asyncio.Event()
+
+        async def wait_forever(payload):
+            await never.wait()
+
+        stalled = AsyncMock()
+        stalled.send_bytes.side_effect = wait_forever
+        await manager.connect(stalled)
+
+        for _ in range(_SEND_QUEUE_SIZE + _SEND_MAX_BATCH + 1):
+            await manager.broadcast({"type": "ping"})
+
+        assert stalled not in manager.active_connections
+        assert stalled not in manager.send_queues
+
+        # The client is closed so the frontend reconnects instead of waiting on replies that are dropped
+        await asyncio.sleep(0)
+        stalled.close.assert_awaited_once_with(code=1013)
+
+    async def test_personal_send_waits_for_queue_space(self):
+        """Test that personal sends apply backpressure when the client falls behind."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+        websocket = AsyncMock()
+
+        async def wait_for_release(payload):
+            await release.wait()
+
+        websocket.send_bytes.side_effect = wait_for_release
+        await manager.connect(websocket)
+
+        # Fill the writer's in-flight batch and then the queue itself
+        for _ in range(_SEND_QUEUE_SIZE + _SEND_MAX_BATCH):
+            await manager.send_personal_message({"type": "ping"}, websocket)
+        await asyncio.sleep(0.01)
+        blocked = asyncio.create_task(manager.send_personal_message({"type": "ping"}, websocket))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        release.set()
+        await asyncio.wait_for(blocked, timeout=1)
+        manager.disconnect(websocket)
+
+    def test_disconnect_removes_socket_from_its_profiles(self):
+        """Test that disconnect uses the reverse map to leave other profiles untouched."""
+        manager = ConnectionManager()
+        websocket, other = AsyncMock(), AsyncMock()
+        manager.profile_connections = {"aws-dev-eu": {websocket, other}, "aws-dev-sg": {other}}
+        manager.ws_to_profiles = {websocket: {"aws-dev-eu"}, other: {"aws-dev-eu", "aws-dev-sg"}}
+
+        manager.disconnect(websocket)
+
+        assert manager.profile_connections == {"aws-dev-eu": {other}, "aws-dev-sg": {other}}
+        assert websocket not in manager.ws_to_profiles
+
+    async def test_send_skips_disconnected_socket(self):
+        """Test that sends to an already-disconnected socket are dropped without trying."""
+        manager = ConnectionManager()
+        websocket = AsyncMock()
+        manager.disconnect(websocket)
+
+        await manager.send_personal_message({"type": "ping"}, websocket)
+
+        websocket.send_bytes.assert_not_awaited()